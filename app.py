@@ -1,123 +1,157 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort, Response, stream_with_context, send_file
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import selectinload, joinedload
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
-from models import db, User, Complaint, Feedback
+from models import db, User, Complaint, Feedback, ComplaintImage
+from urgency import calculate_urgency, score_rows, crossed_sensitivity_step, SENSITIVITY_STEPS
+from scheduler import PeriodicTask
+from tasks import TaskQueue, STATUSES
+from assignment import assignment_index
+from pagination import keyset_paginate
+from export import EXPORT_COLUMNS, FORMATS, export_chunks
+from ingest import ingest, parse_json, parse_ndjson
+from idgen import complaint_ids
+from charts import ChartRenderer
+from sentiment import analyzer as sentiment_analyzer, label_texts
+from chatbot_engine import SmartChatbot, LEGACY_ID_RE
+from complaint_status import ComplaintStatusCache
+from conversations import ConversationStore
+from uploads import UploadStore
+from thumbnails import ThumbnailPipeline
+import stats
 from flask_migrate import Migrate
-from flask_socketio import SocketIO, send
-from textblob import TextBlob
-import matplotlib.pyplot as plt
-import io
-import base64
-from collections import Counter
+from flask_socketio import SocketIO
+from collections import Counter, deque
 import json
+import mimetypes
+import threading
+import time
+import click
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///railway_grievance.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///railway_grievance.db')
 app.config['SECRET_KEY'] = 'your_secret_key'  # Change this to a secure key
 app.config['UPLOAD_FOLDER'] = 'uploads/'
+# Caps every request body (complaint photos, bulk JSON); larger requests get a 413
+app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024
+# Let the front-end server send upload bytes: USE_X_SENDFILE for Apache/lighttpd,
+# or an nginx `internal` location aliased to UPLOAD_FOLDER, e.g. '/protected-uploads'
+app.config['USE_X_SENDFILE'] = False
+app.config['MEDIA_X_ACCEL_PREFIX'] = None
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 socketio = SocketIO(app)
 
 migrate = Migrate(app, db)
 
+upload_store = UploadStore(app.config['UPLOAD_FOLDER'])
+thumbnail_pipeline = ThumbnailPipeline(upload_store, os.path.join(app.config['UPLOAD_FOLDER'], 'derived'))
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+chart_renderer = ChartRenderer()
+
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
 def analyze_sentiment(feedback_text):
-    blob = TextBlob(feedback_text)
-    sentiment = blob.sentiment.polarity
-    if sentiment > 0:
-        return "Positive"
-    elif sentiment < 0:
-        return "Negative"
-    else:
-        return "Neutral"
-
-def generate_feedback_trend_graph(trend_data):
-    # Generate the graph for feedback trend
-    months = [data[0] for data in trend_data]
-    counts = [data[1] for data in trend_data]
-
-    plt.figure(figsize=(10, 5))
-    plt.plot(months, counts, marker='o', color='b')
-    plt.title("Feedback Trend Over Time")
-    plt.xlabel("Month")
-    plt.ylabel("Number of Feedbacks")
-    
-    # Save the plot to a BytesIO object and convert it to base64
-    img = io.BytesIO()
-    plt.savefig(img, format='png')
-    img.seek(0)
-    plot_url = base64.b64encode(img.getvalue()).decode('utf8')
-    
-    return plot_url
-# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
-
-def calculate_urgency(complaint):     
-    department_weights = {
-        "Safety and Security": 10,
-        "Medical Assistance": 10,
-        "Cleaning and Maintenance": 8,
-        "Lost and Found": 7,
-        "Food Services": 6,
-        "Passenger Services": 5,
-        "Ticket Booking": 4,
-        "Reservation": 4,
-        "Customer Support": 4,
-        "Complaints": 3,
-        "Train Operations": 3
-    }
-
-    # Default keyword scoring system
-    keywords_scores = {"safety": 10, "emergency": 10, "accident": 10, "injury": 10, "fire": 10, "medical": 9, "danger": 9, "attack": 9, "violence": 9, "terrorism": 9, "bomb": 9, "explosion": 9, "collide": 8, "crash": 8, "emergency services": 8, "broken": 7, "damage": 7, "fault": 7, "disaster": 7, "system failure": 7, "train malfunction": 7, "power outage": 6, "service interruption": 6, "delayed": 6, "late": 6, "missed connection": 6, "disruption": 6, "schedule issue": 6, 
-                       "transportation issue": 6, "ticketing issue": 6, "strike": 6, "late arrival": 5, "wrong ticket": 5, "wrong information": 5, "confusion": 5, "error": 5, "lost luggage": 5, "lost property": 5, "missing item": 5, "damaged property": 5, "lost reservation": 5, "incorrect booking": 5, "wrong booking": 5, "overbooked": 5, "sick": 5, "ill": 5, "miscommunication": 4, 
-                       "misunderstanding": 4, "poor service": 4, "bad experience": 4, "unhelpful": 4, "unprofessional": 4, "rude staff": 4, "long wait": 4, "unorganized": 4, "uncomfortable": 4, "slow service": 4, "disrespectful": 4, "unavailable": 4, "noise": 4, "unhygienic": 4, "dirty": 4, "unreliable": 4, "unresolved": 4, "unsatisfactory": 4, "poor quality": 4, "insufficient": 4, 
-                       "misplaced": 4, "not functioning": 4, "unresolved issue": 4, "inconvenient": 3, "unreliable system": 3, "inefficient": 3, "poor condition": 3, "poorly maintained": 3, "broken equipment": 3, "slow response": 3, "lack of information": 3, "lack of communication": 3, "inadequate": 3, "incompetent": 3, "unaccommodating": 3, "unhelpful staff": 3, "unprepared": 3, "unresponsive": 3, 
-                       "confusing": 3, "complicated": 3, "displeased": 3, "frustrated": 3, "inconvenience": 3, "poor support": 3, "lacking": 3, "negative experience": 3, "disorganized": 3, "unavailable staff": 3, "broken facility": 3, "unhappy": 3, "noisy environment": 3, "discomfort": 3, "mistake": 3, "inaccurate": 3, "poor treatment": 3, "overcrowded": 3, "unsuitable": 3, "inappropriate": 3, 
-                       "misleading": 3, "faulty": 3, "unpleasant": 3, "conflicting": 3, "defective": 3, "unskilled": 3, "untrained": 3, "poor infrastructure": 3, "incorrect information": 3, "long delays": 2, "missed opportunity": 2, "wrong timing": 2, "inconsistent": 2, "mismatched": 2, "insufficient support": 2, "bad scheduling": 2, "long queue": 2, "no response": 2, "unqualified": 2, "insufficient staff": 2, 
-                       "no alternative": 2, "unattractive": 2, "unfriendly": 2, "not helpful": 2, "delay response": 2, "not fixed": 2, "stressed": 2, "unacceptable": 2, "poor condition of service": 2, "unbalanced": 2, "unsatisfactory condition": 2, "neglected": 2, "poorly executed": 2, "worn out": 2, "old": 2, "bothering": 2, "damaged goods": 2, "incomplete": 2, "not up to mark": 2, "low quality": 2, "bad experience overall": 2, 
-                       "poor facilities": 2, "unmotivated": 2, "horrible": 2, "undelivered": 2, "unconfirmed": 2, "missed opportunity": 2, "incomplete order": 2, "improper": 2, "failed": 2, "subpar": 2, "unsatisfactory service": 2, "terrible": 2, "mismanagement": 2, "unsure": 2, "unfocused": 2, "offensive": 2, "incompetence": 2, "frustration": 2, "unrealistic": 2, "unbelievable": 2, "faulty equipment": 2, "dissatisfied": 2, "lack of cleanliness": 1, 
-                       "problem": 1, "issue": 1, "complaint": 1, "concern": 1, "other": 1}
-
-    
-    impact_score = 1  # Default impact score for non-critical keywords
-    for keyword, score in keywords_scores.items():
-        if keyword in complaint.additional_info.lower():
-            impact_score = score
-            break
-
-    # Time Sensitivity Factor
-    time_elapsed = datetime.now() - datetime.combine(complaint.date, complaint.time)
-    hours_elapsed = time_elapsed.total_seconds() / 3600
-    if hours_elapsed <= 1:
-        time_sensitivity = 3
-    elif hours_elapsed <= 6:
-        time_sensitivity = 2
-    else:
-        time_sensitivity = 1
-
-    # Age Factor
-    age_factor = 2 if complaint.age > 65 else (1 if complaint.age < 18 else 0)
-
-    # Department Weight
-    department_weight = department_weights.get(complaint.department, 3)  # Default weight 3 for undefined departments
-
-    # Calculate Urgency
-    urgency = (impact_score * time_sensitivity) + age_factor + department_weight
-    return urgency
-
-
+    return sentiment_analyzer.label(feedback_text)
+
+def rescore_urgency(query, now=None, since=None, batch_size=1000):
+    # Score every complaint matched by `query` in one vectorized pass and
+    # write back only the rows whose urgency changed, as executemany UPDATEs
+    now = now or datetime.now()
+    rows = query.with_entities(
+        Complaint.id, Complaint.department, Complaint.date, Complaint.time,
+        Complaint.age, Complaint.additional_info, Complaint.urgency
+    ).all()
+    if since is not None:
+        # Only complaints that aged past a time sensitivity step can have changed
+        rows = [row for row in rows if crossed_sensitivity_step(datetime.combine(row.date, row.time), since, now)]
+    ids, urgencies = score_rows([row[:6] for row in rows], now=now)
+
+    changes = [
+        {'id': complaint_id, 'urgency': int(urgency)}
+        for complaint_id, urgency, row in zip(ids, urgencies, rows)
+        if row.urgency != urgency
+    ]
+    for i in range(0, len(changes), batch_size):
+        db.session.bulk_update_mappings(Complaint, changes[i:i + batch_size])
+    db.session.commit()
+    return len(rows), len(changes)
+
+def rescore_aged_complaints(last_run, now):
+    query = Complaint.query.filter(Complaint.status == 'Unsolved')
+    if last_run is not None:
+        # Narrow to the dates that can hold a complaint crossing a step
+        query = query.filter(
+            Complaint.date >= (last_run - SENSITIVITY_STEPS[-1]).date(),
+            Complaint.date <= (now - SENSITIVITY_STEPS[0]).date()
+        )
+    scanned, updated = rescore_urgency(query, now=now, since=last_run)
+    return {'rescored': scanned, 'updated': updated}
+
+urgency_rescorer = PeriodicTask('urgency-rescore', rescore_aged_complaints, interval=300, app=app)
+
+# The assignment index lives in this process, so its first run warms it
+assignment_reconciler = PeriodicTask('assignment-reconcile', lambda last_run, now: assignment_index.reconcile(), interval=600, app=app)
+
+# Durable queue for work that does not need to finish inside the request
+task_queue = TaskQueue(os.path.join(app.instance_path, 'tasks.db'), app=app)
+
+@task_queue.handler('score_feedback')
+def score_feedback(feedback_id):
+    feedback = db.session.get(Feedback, feedback_id)
+    if feedback is None or feedback.sentiment is not None:
+        return  # deleted, or already scored by an earlier attempt
+    sentiment = analyze_sentiment(feedback.feedback_text)
+    # Only the job that fills the NULL counts the feedback, even if the sweep queued a duplicate
+    claimed = db.session.execute(
+        db.update(Feedback)
+        .where(Feedback.id == feedback_id, Feedback.sentiment.is_(None))
+        .values(sentiment=sentiment)
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return
+    feedback.sentiment = sentiment
+    # Sentiment and its rollup counters land in one transaction
+    stats.record_feedback(feedback.complaint, feedback)
+    db.session.commit()
+
+FEEDBACK_SWEEP_GRACE = timedelta(minutes=2)
+
+def requeue_unscored_feedback(last_run, now):
+    # Feedback is committed before its job is queued in tasks.db; if the process
+    # died in between, the feedback would stay unscored. Queue those again,
+    # skipping any that still have a queued, running or failed job.
+    cutoff = datetime.utcnow() - FEEDBACK_SWEEP_GRACE
+    queued = {payload.get('feedback_id') for payload in task_queue.payloads('score_feedback')}
+    unscored = [
+        feedback_id for (feedback_id,) in
+        db.session.query(Feedback.id).filter(Feedback.sentiment.is_(None), Feedback.created_at < cutoff)
+        if feedback_id not in queued
+    ]
+    for feedback_id in unscored:
+        task_queue.enqueue('score_feedback', feedback_id=feedback_id)
+    return {'requeued': len(unscored)}
+
+# Runs when the scheduler starts and every 5 minutes after
+feedback_sweeper = PeriodicTask('feedback-sweep', requeue_unscored_feedback, interval=300, app=app)
+
+@task_queue.handler('make_thumbnails')
+def make_thumbnails(digest):
+    # Renders in the thumbnail process pool; already rendered variants are skipped
+    thumbnail_pipeline.generate(digest)
 # -----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -194,6 +228,9 @@ def register():
         db.session.add(new_user)
         db.session.commit()
 
+        if role == 'Employee':
+            assignment_index.add_employee(new_user.id, new_user.username, department)
+
         flash('Registration successful! Please login.', 'success')
         return redirect(url_for('login'))
 
@@ -201,11 +238,56 @@ def register():
 
 
 # ----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Stable orderings for keyset pagination; the last column breaks ties
+BY_URGENCY = (Complaint.urgency, Complaint.id)
+BY_RECENT = (Complaint.date, Complaint.time, Complaint.id)
+
+def complaint_listing(listing, department=None):
+    # The query and ordering behind each complaint list, shared by the
+    # dashboards and /api/complaints/<listing>
+    if listing == 'mine':
+        return Complaint.query.filter_by(user_id=current_user.id), BY_RECENT
+    if listing == 'track':
+        # Complaints that are either unsolved or completed without feedback
+        return Complaint.query.filter(
+            (Complaint.user_id == current_user.id) &
+            ((Complaint.status == 'Unsolved') | (~Complaint.feedbacks.any()))
+        ), BY_RECENT
+    if listing == 'assigned':
+        return Complaint.query.filter_by(assigned_employee_id=current_user.id), BY_URGENCY
+    if listing == 'department':
+        return Complaint.query.filter_by(department=department), BY_URGENCY
+    return None
+
+def complaint_page(listing, department=None, options=()):
+    query, columns = complaint_listing(listing, department)
+    per_page = min(request.args.get('per_page', 50, type=int), 200)
+    try:
+        return keyset_paginate(query.options(*options), columns, request.args.get('cursor'), max(per_page, 1))
+    except ValueError:
+        abort(400, 'Invalid cursor')
+
+def complaint_to_dict(complaint):
+    return {
+        'id': complaint.id,
+        'unique_id': complaint.unique_id,
+        'department': complaint.department,
+        'date': complaint.date.isoformat(),
+        'time': complaint.time.isoformat(),
+        'pnr_no': complaint.pnr_no,
+        'age': complaint.age,
+        'additional_info': complaint.additional_info,
+        'status': complaint.status,
+        'urgency': complaint.urgency,
+        'user_id': complaint.user_id,
+        'assigned_employee_id': complaint.assigned_employee_id
+    }
+
 @app.route('/user_dashboard')
 @login_required
 def user_dashboard():
-    complaints = Complaint.query.filter_by(user_id=current_user.id).all()
-    return render_template('user_dashboard.html', complaints=complaints)
+    # The passenger's complaints are listed (paginated) on track_complaints
+    return render_template('user_dashboard.html')
 
 
 @app.route('/complaint', methods=['GET', 'POST'])
@@ -226,33 +308,32 @@ def complaint():
             flash('Invalid age. Please enter a valid number.', 'error')
             return redirect(url_for('complaint'))
 
-        # Ensure the upload directory exists
-        if not os.path.exists(app.config['UPLOAD_FOLDER']):
-            os.makedirs(app.config['UPLOAD_FOLDER'])
-
-        unique_id = str(datetime.now().timestamp())  # Generate a unique ID based on the current timestamp
+        unique_id = complaint_ids.next_id()  # Time-ordered; the leased worker id keeps processes apart
         department = request.form['department']
         pnr_no = request.form['pnr_no']
         additional_info = request.form['additional_info']
 
-        # Handle image upload
-        images = request.files.getlist('images')
-        image_paths = []
-        for image in images:
-            if image:
-                filename = secure_filename(image.filename)
-                image.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                image_paths.append(filename)
-        images_str = ','.join(image_paths)
-
-        # Find the employee with the fewest unsolved complaints in the same department
-        employee = (
-            User.query.filter_by(role='Employee', department=department)
-            .outerjoin(Complaint, (Complaint.assigned_employee_id == User.id) & (Complaint.status == 'Unsolved'))
-            .group_by(User.id)
-            .order_by(db.func.count(Complaint.id))
-            .first()
-        )
+        # Stream each image into the content-addressed store; identical photos are stored once
+        image_files = []
+        unrendered = []
+        for image in request.files.getlist('images'):
+            if image and image.filename:
+                digest, size, created = upload_store.save(image.stream)
+                # Also covers blobs stored earlier whose variants were never rendered
+                if (image.mimetype.startswith('image/') and digest not in unrendered
+                        and thumbnail_pipeline.missing(digest)):
+                    unrendered.append(digest)
+                image_files.append(ComplaintImage(
+                    digest=digest,
+                    filename=secure_filename(image.filename) or 'image',
+                    content_type=image.mimetype,
+                    size=size,
+                    position=len(image_files)
+                ))
+
+        # Pick the employee with the fewest unsolved complaints in the same department
+        employee = assignment_index.pick(department)
+        employee_id, employee_name = employee if employee else (None, None)
 
         # Create the complaint with the assigned employee
         complaint = Complaint(
@@ -263,18 +344,28 @@ def complaint():
             pnr_no=pnr_no,
             age=age,
             additional_info=additional_info,
-            images=images_str,
+            image_files=image_files,
             user_id=current_user.id,
-            assigned_employee_id=employee.id if employee else None  # Assign if an employee is available
+            assigned_employee_id=employee_id  # Assign if an employee is available
         )
 
         complaint.urgency = calculate_urgency(complaint)
 
         db.session.add(complaint)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            if employee_id:
+                assignment_index.release(employee_id)
+            raise
+
+        # Dashboard thumbnails and previews are rendered in the background
+        for digest in unrendered:
+            task_queue.enqueue('make_thumbnails', digest=digest)
 
         if employee:
-            flash(f'Complaint submitted successfully and assigned to {employee.username}!', 'success')
+            flash(f'Complaint submitted successfully and assigned to {employee_name}!', 'success')
         else:
             flash('Complaint submitted successfully, but no employee is available for assignment.', 'warning')
 
@@ -286,13 +377,10 @@ def complaint():
 @app.route('/track_complaints')
 @login_required
 def track_complaints():
-    # Get all complaints filed by the logged-in user that are either unsolved or completed without feedback
-    complaints = Complaint.query.filter(
-        (Complaint.user_id == current_user.id) &
-        ((Complaint.status == 'Unsolved') | (~Complaint.feedbacks.any()))
-    ).all()
+    # Complaints filed by the logged-in user that are either unsolved or completed without feedback
+    page = complaint_page('track', options=[selectinload(Complaint.feedbacks)])
 
-    return render_template('track_complaints.html', complaints=complaints)
+    return render_template('track_complaints.html', complaints=page.items, next_cursor=page.next_cursor)
 
 
 
@@ -310,7 +398,6 @@ def submit_feedback(complaint_id):
     if request.method == 'POST':
         feedback_text = request.form['feedback_text']
         rating = request.form.get('rating', type=int)  # Get rating from form
-        sentiment = analyze_sentiment(feedback_text)
 
         # Check if feedback already exists for the complaint
         existing_feedback = Feedback.query.filter_by(complaint_id=complaint.id).first()
@@ -322,14 +409,19 @@ def submit_feedback(complaint_id):
         feedback = Feedback(
             complaint_id=complaint.id,
             feedback_text=feedback_text,
-            sentiment=sentiment,
+            sentiment=None,  # scored by the task queue
             rating=rating  # Include rating
         )
+        feedback.created_at = datetime.utcnow()
         db.session.add(feedback)
 
         # Update complaint status if needed
         complaint.feedback_status = 'Completed'
+
         db.session.commit()
+
+        # Sentiment and the statistics rollup are filled in by the task queue
+        task_queue.enqueue('score_feedback', feedback_id=feedback.id)
         
         flash('Feedback submitted successfully!', 'success')
         return redirect(url_for('user_dashboard'))
@@ -343,35 +435,29 @@ def submit_feedback(complaint_id):
 @app.route('/admin_dashboard/<department>')
 @login_required
 def admin_dashboard(department):
-    # Fetch complaints for the specified department
-    complaints = Complaint.query.filter_by(department=department).all()
-    
+    # One page of the department's complaints, most urgent first, with their feedback
+    page = complaint_page('department', department, options=[selectinload(Complaint.feedbacks)])
+    complaints = page.items
+
     # Attach feedback to each complaint
     for complaint in complaints:
-        feedback = Feedback.query.filter_by(complaint_id=complaint.id).first()
-        complaint.feedback = feedback
+        complaint.feedback = complaint.feedbacks[0] if complaint.feedbacks else None
 
-    # Sentiment analysis statistics
-    feedbacks = Feedback.query.join(Complaint).filter(Complaint.department == department).all()
-    sentiment_counts = {'Positive': 0, 'Neutral': 0, 'Negative': 0}
-    for feedback in feedbacks:
-        if feedback.sentiment in sentiment_counts:
-            sentiment_counts[feedback.sentiment] += 1
+    # Sentiment counts, ratings and the daily trend from the statistics rollup
+    summary = stats.department_summary(department)
+    sentiment_counts = stats.sentiment_counts(summary)
 
     # Average user rating for the department
-    ratings = [feedback.rating for feedback in feedbacks if feedback.rating is not None]
-    avg_rating = round(sum(ratings) / len(ratings), 2) if ratings else "No ratings yet"
+    avg_rating = round(summary.rating_sum / summary.rating_count, 2) if summary.rating_count else "No ratings yet"
 
     # Prepare data for feedback trend graph (feedback count per day)
-    feedback_dates = [feedback.created_at.date().isoformat() for feedback in feedbacks if feedback.created_at]
-    feedback_trend = Counter(feedback_dates)
-    sorted_trend_data = sorted(feedback_trend.items())
+    days = stats.daily_rows(department)
     trend_data = {
-        "labels": [date for date, _ in sorted_trend_data],
-        "data": [count for _, count in sorted_trend_data]
+        "labels": [day.key for day in days],
+        "data": [day.feedback_count for day in days]
     }
 
-    return render_template('admin_dashboard.html', complaints=complaints, sentiment_counts=sentiment_counts, avg_rating=avg_rating, trend_data=json.dumps(trend_data))
+    return render_template('admin_dashboard.html', complaints=complaints, next_cursor=page.next_cursor, sentiment_counts=sentiment_counts, avg_rating=avg_rating, solved_count=summary.solved_count, trend_data=json.dumps(trend_data))
 
 
 
@@ -385,8 +471,11 @@ def view_employees():
     
     # Filter employees by the admin's department
     employees = User.query.filter_by(role='Employee', department=current_user.department).all()
-    
-    return render_template('view_employees.html', employees=employees, department=current_user.department)
+
+    # Complaints each employee has solved, from the statistics rollup
+    solved = {int(row.key): row.solved_count for row in stats.employee_rows(current_user.department)}
+
+    return render_template('view_employees.html', employees=employees, solved=solved, department=current_user.department)
 
 # ----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 @app.route('/employee_dashboard')
@@ -396,10 +485,51 @@ def employee_dashboard():
         flash("Access denied: Only employees can view this page.", 'danger')
         return redirect(url_for('home'))
     
-    # Fetch complaints assigned to the current employee
-    assigned_complaints = Complaint.query.filter_by(assigned_employee_id=current_user.id).order_by(Complaint.urgency.desc()).all()
+    # Fetch complaints assigned to the current employee, most urgent first
+    page = complaint_page('assigned', options=(selectinload(Complaint.image_files),))
     
-    return render_template('employee_dashboard.html', complaints=assigned_complaints)
+    return render_template('employee_dashboard.html', complaints=page.items, next_cursor=page.next_cursor)
+
+@app.route('/api/complaints/<listing>')
+@login_required
+def complaints_api(listing):
+    # JSON pages of the dashboard lists; pass next_cursor back as ?cursor=
+    department = None
+    if listing == 'department':
+        if current_user.role != 'Admin':
+            return jsonify({'error': 'Only admins can list department complaints.'}), 403
+        department = request.args.get('department', current_user.department)
+    elif listing == 'assigned' and current_user.role != 'Employee':
+        return jsonify({'error': 'Only employees have assigned complaints.'}), 403
+    elif complaint_listing(listing) is None:
+        return jsonify({'error': f'Unknown listing {listing}.'}), 404
+
+    page = complaint_page(listing, department)
+    return jsonify({
+        'complaints': [complaint_to_dict(complaint) for complaint in page.items],
+        'next_cursor': page.next_cursor
+    })
+
+BULK_MAX_ROWS = 5000
+
+@app.route('/api/complaints/bulk', methods=['POST'])
+@login_required
+def bulk_complaints_api():
+    # JSON list (or {"complaints": [...]}) or NDJSON; admins may file for other users via user_id
+    try:
+        if request.mimetype == 'application/x-ndjson':
+            rows, errors = parse_ndjson(request.stream, limit=BULK_MAX_ROWS)
+        else:
+            rows, errors = parse_json(request.get_data())
+    except ValueError as exc:
+        return jsonify({'error': f'Invalid payload: {exc}'}), 400
+    if len(rows) + len(errors) > BULK_MAX_ROWS:
+        return jsonify({'error': f'At most {BULK_MAX_ROWS} complaints per request.'}), 413
+
+    report = ingest(rows, current_user.id, allow_user_id=current_user.role == 'Admin')
+    report['errors'] = sorted(errors + report['errors'], key=lambda error: error['row'])
+    report['received'] += len(errors)
+    return jsonify(report), 200 if report['inserted'] or not report['errors'] else 422
 
 @app.route('/mark_as_solved/<complaint_id>', methods=['POST'])
 @login_required
@@ -407,10 +537,16 @@ def mark_as_solved(complaint_id):
     # Find the complaint by unique ID
     complaint = Complaint.query.filter_by(unique_id=complaint_id).first()
 
-    if complaint:
+    if complaint and complaint.status != 'Completed':
         # Delete the complaint from the database
+        was_open = complaint.status == 'Unsolved'
         complaint.status = 'Completed'
+        stats.record_solved(complaint)
         db.session.commit()
+        complaint_status_cache.invalidate(complaint.id, complaint.unique_id, complaint.legacy_unique_id)
+
+        if was_open and complaint.assigned_employee_id:
+            assignment_index.release(complaint.assigned_employee_id)
 
     return redirect(url_for('employee_dashboard'))
 
@@ -453,15 +589,60 @@ def mark_as_solved(complaint_id):
     
 #     return render_template('chat.html', user_message=user_message, bot_response=bot_response)
 
-from flask import Flask, render_template, request, jsonify
-from chatbot_engine import SmartChatbot
-from flask_socketio import SocketIO
+def load_complaint_status(reference):
+    # Primary key, tracking number or pre-idgen tracking number; all indexed
+    with app.app_context():
+        query = db.session.query(
+            Complaint.id, Complaint.unique_id, Complaint.status, Complaint.urgency,
+            Complaint.department, Complaint.user_id, Complaint.assigned_employee_id
+        )
+        if reference.isdigit():
+            row = query.filter(Complaint.id == int(reference)).first()
+        elif LEGACY_ID_RE.fullmatch(reference):
+            row = query.filter(Complaint.legacy_unique_id == reference).first()
+        else:
+            row = query.filter(Complaint.unique_id == reference).first()
+        return row._asdict() if row else None
+
+complaint_status_cache = ComplaintStatusCache(load_complaint_status)
+
+def chat_viewer():
+    # Plain tuple so it can be handed to the chatbot thread pool
+    if not current_user.is_authenticated:
+        return None
+    return (current_user.id, current_user.role, current_user.department)
+
+def lookup_complaint_status(reference, viewer):
+    if reference.isdigit():
+        # "012" and "12" are the same complaint, and invalidate() uses str(complaint.id)
+        reference = str(int(reference))
+    complaint = complaint_status_cache.get(reference)
+    if complaint is None:
+        return None
+    user_id, role, department = viewer
+    if role == 'Admin':
+        visible = complaint['department'] == department
+    elif role == 'Employee':
+        visible = complaint['assigned_employee_id'] == user_id
+    else:
+        visible = complaint['user_id'] == user_id
+    # Someone else's complaint looks exactly like a missing one
+    return complaint if visible else None
 
-socketio = SocketIO(app)
+bot = SmartChatbot(status_lookup=lookup_complaint_status)
+
+# Per-socket chat history, bounded by session count, turns and idle time
+conversations = ConversationStore()
 
-bot = SmartChatbot()
+# Idle sessions are otherwise only expired when some socket sends a message
+conversation_purger = PeriodicTask('conversation-purge', lambda last_run, now: {'purged': conversations.purge_expired()}, interval=300)
 
-conversation_memory = {}
+# Inference runs off the socket event handlers so slow replies never block other sockets.
+# A session has at most one message in the pool; later ones wait in its queue so
+# replies come back in order.
+chat_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='chatbot')
+chat_queues = {}
+chat_queues_lock = threading.Lock()
 
 @app.route("/chatbot")
 def chatbot():
@@ -473,65 +654,109 @@ def chatbot_message():
 
     message = request.json["message"]
 
-    response = bot.generate_response(message)
+    response = bot.generate_response(message, chat_viewer())
 
     return jsonify({"response":response})
 
 
+@app.route("/admin/chatbot_stats")
+@login_required
+def chatbot_stats():
+    if current_user.role != 'Admin':
+        return jsonify({'error': 'Only admins can view chatbot stats.'}), 403
+    return jsonify(dict(bot.stats(), conversations=conversations.stats(), status_cache=complaint_status_cache.stats()))
+
+
+def submit_chat_message(sid, msg, viewer):
+    future = chat_executor.submit(bot.generate_response, msg, viewer)
+    future.add_done_callback(lambda f: reply_to_socket(sid, f))
+
+
+def reply_to_socket(sid, future):
+    try:
+        response = future.result()
+    except Exception:
+        app.logger.exception('Chatbot reply failed for %s', sid)
+        response = "Sorry, something went wrong. Please try again."
+
+    with chat_queues_lock:
+        if sid not in chat_queues:
+            return  # disconnected while we were thinking; don't bring the session back
+        conversations.append(sid, 'bot', response)
+    socketio.send(response, to=sid)
+
+    with chat_queues_lock:
+        waiting = chat_queues.get(sid)
+        if not waiting:
+            chat_queues.pop(sid, None)
+            return
+        msg, viewer = waiting.popleft()
+    submit_chat_message(sid, msg, viewer)
+
+
 @socketio.on("message")
 def handle_message(msg):
 
-    response = bot.generate_response(msg)
+    sid = request.sid
+    viewer = chat_viewer()
+    conversations.append(sid, 'user', msg)
+
+    with chat_queues_lock:
+        waiting = chat_queues.get(sid)
+        if waiting is not None:
+            waiting.append((msg, viewer))  # bounded; a flooding client loses its oldest messages
+            return
+        chat_queues[sid] = deque(maxlen=20)
+    submit_chat_message(sid, msg, viewer)
+
+
+@socketio.on("disconnect")
+def handle_disconnect(*args):
 
-    socketio.send(response)
+    sid = request.sid
+    # Dropped from chat_queues first, so an in-flight reply sees the disconnect
+    with chat_queues_lock:
+        chat_queues.pop(sid, None)
+    conversations.discard(sid)
 
 # ----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 @app.route('/admin/statistics/<department>')
 @login_required
 def statistics(department):
-    # Get feedback data for the department
-    feedbacks = Feedback.query.filter(Complaint.department == department).join(Complaint).all()
+    # Department totals come from the statistics rollup
+    summary = stats.department_summary(department)
 
     # Calculate average rating per user or department
-    avg_rating = sum(feedback.rating for feedback in feedbacks) / len(feedbacks) if feedbacks else 0
+    avg_rating = summary.rating_sum / summary.rating_count if summary.rating_count else 0
 
     # Get the sentiment counts
-    sentiment_counts = {
-        'Positive': sum(1 for feedback in feedbacks if feedback.sentiment == 'Positive'),
-        'Negative': sum(1 for feedback in feedbacks if feedback.sentiment == 'Negative'),
-        'Neutral': sum(1 for feedback in feedbacks if feedback.sentiment == 'Neutral'),
-    }
+    sentiment_counts = stats.sentiment_counts(summary)
 
-    # Feedback trend
-    trend_data = db.session.query(
-        db.func.strftime('%Y-%m', Feedback.timestamp).label('month'),
-        db.func.count().label('count')
-    ).group_by('month').all()
+    # Feedback trend per month, summed from the daily rollup rows
+    monthly = Counter()
+    for day in stats.daily_rows(department):
+        monthly[day.key[:7]] += day.feedback_count
+    trend_data = sorted(monthly.items())
 
-    # Generate feedback trend graph
-    trend_graph = generate_feedback_trend_graph(trend_data)
+    # Feedback trend graph, redrawn only when the department's feedback changed
+    trend_graph = chart_renderer.trend_graph(department, (summary.id, summary.feedback_count), trend_data)
 
     return render_template('admin_statistics.html', avg_rating=avg_rating, sentiment_counts=sentiment_counts, trend_data=trend_data, trend_graph=trend_graph)
 
 @app.route('/admin/statistics/employee_performance/<department>')
 @login_required
 def employee_performance(department):
-    # Get feedback data with the employees responsible for each complaint
-    feedbacks = Feedback.query.join(Complaint).filter(Complaint.department == department).all()
-    
-    # Create a dictionary to store employee performance data
+    # Per-employee feedback counters from the statistics rollup
     employee_performance = {}
-    for feedback in feedbacks:
-        employee = feedback.complaint.assigned_employee
-        if employee:
-            if employee.id not in employee_performance:
-                employee_performance[employee.id] = {'positive': 0, 'negative': 0, 'total': 0}
-            employee_performance[employee.id]['total'] += 1
-            if feedback.sentiment == 'Positive':
-                employee_performance[employee.id]['positive'] += 1
-            elif feedback.sentiment == 'Negative':
-                employee_performance[employee.id]['negative'] += 1
+    for row in stats.employee_rows(department):
+        if row.feedback_count or row.solved_count:
+            employee_performance[int(row.key)] = {
+                'positive': row.positive_count,
+                'negative': row.negative_count,
+                'total': row.feedback_count,
+                'solved': row.solved_count
+            }
 
     # Pass employee performance data to the template
     return render_template('employee_performance.html', employee_performance=employee_performance)
@@ -556,14 +781,407 @@ def logout():
     logout_user()
     return redirect(url_for('login'))
 
+# Shown inline; anything else is downloaded, so an uploaded HTML/SVG file can't run in our origin
+INLINE_MEDIA_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/bmp'}
+
+def visible_image(digest):
+    # An attachment with this content on a complaint the current user may see
+    query = ComplaintImage.query.join(ComplaintImage.complaint).filter(ComplaintImage.digest == digest)
+    if current_user.role == 'Admin':
+        query = query.filter(Complaint.department == current_user.department)
+    elif current_user.role == 'Employee':
+        query = query.filter(Complaint.assigned_employee_id == current_user.id)
+    else:
+        query = query.filter(Complaint.user_id == current_user.id)
+    return query.first()
+
+def send_media(path, mimetype, etag, download_name=None):
+    as_attachment = mimetype not in INLINE_MEDIA_TYPES
+    accel_prefix = app.config['MEDIA_X_ACCEL_PREFIX']
+    if accel_prefix:
+        # nginx streams the file (including Range requests) from its internal location
+        relative = os.path.relpath(path, app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{relative}"
+        if download_name:
+            response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline',
+                                 filename=download_name)
+        response.set_etag(etag)
+        response.make_conditional(request)
+    else:
+        # Handles If-None-Match (304) and Range (206); honours USE_X_SENDFILE
+        response = send_file(os.path.abspath(path), mimetype=mimetype, etag=etag,
+                             download_name=download_name, as_attachment=as_attachment)
+    # Content-addressed, so a URL never changes meaning; private because it needs a login
+    response.cache_control.no_cache = None  # send_file's default
+    response.cache_control.private = True
+    response.cache_control.max_age = 365 * 24 * 3600
+    response.cache_control.immutable = True
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+@app.route('/media/<digest>')
+@login_required
+def media(digest):
+    try:
+        path = upload_store.path_for(digest)
+    except ValueError:
+        abort(404)
+    image = visible_image(digest)
+    if image is None or not os.path.exists(path):
+        abort(404)
+    return send_media(path, image.content_type or 'application/octet-stream', digest, image.filename)
+
+@app.route('/media/<digest>/<variant>')
+@login_required
+def media_variant(digest, variant):
+    try:
+        path = thumbnail_pipeline.path_for(digest, variant)
+    except ValueError:
+        abort(404)
+    if visible_image(digest) is None:
+        abort(404)
+    if not os.path.exists(path):
+        # Not rendered yet (or not an image): fall back to the original
+        return redirect(url_for('media', digest=digest))
+    return send_media(path, 'image/jpeg', f'{digest}-{variant}')
+
 @app.route('/view_database')
 def view_database():
-    users = User.query.all()  # Fetch all users from the User table
-    complaints = Complaint.query.all()  # Fetch all complaints from the Complaint table
-    feedbacks = Feedback.query.all()
+    # One keyset page per table; each table keeps its own cursor in the query string
+    try:
+        users = keyset_paginate(User.query, (User.id,), request.args.get('users'))
+        complaints = keyset_paginate(
+            Complaint.query.options(selectinload(Complaint.image_files)), (Complaint.id,), request.args.get('complaints')
+        )
+        feedbacks = keyset_paginate(
+            Feedback.query.options(joinedload(Feedback.complaint)), (Feedback.id,), request.args.get('feedbacks')
+        )
+    except ValueError:
+        abort(400, 'Invalid cursor')
     return render_template('database.html', users=users, complaints=complaints, feedbacks=feedbacks)
 
+def parse_export_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+@app.route('/export/<table>')
+@login_required
+def export_table(table):
+    # ?format=csv|ndjson&department=&from=YYYY-MM-DD&to=YYYY-MM-DD&gzip=1
+    if current_user.role != 'Admin':
+        abort(403)
+    fmt = request.args.get('format', 'csv')
+    if table not in EXPORT_COLUMNS or fmt not in FORMATS:
+        abort(404)
+    try:
+        filters = {
+            'department': request.args.get('department'),
+            'date_from': parse_export_date(request.args.get('from')),
+            'date_to': parse_export_date(request.args.get('to'))
+        }
+    except ValueError:
+        abort(400, 'Dates must be YYYY-MM-DD')
+
+    compress = request.args.get('gzip', type=int) == 1
+    filename = f'{table}.{fmt}' + ('.gz' if compress else '')
+    return Response(
+        stream_with_context(export_chunks(table, fmt, compress, **filters)),
+        mimetype='application/gzip' if compress else FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+# ----------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
+# Scheduled tasks work on the database and can run in any process;
+# in-process tasks maintain state held by this web process
+scheduled_tasks = [urgency_rescorer, feedback_sweeper, task_queue]
+in_process_tasks = [assignment_reconciler, conversation_purger]
+background_tasks = scheduled_tasks + in_process_tasks
+
+def start_background_tasks(tasks=background_tasks):
+    for task in tasks:
+        task.start()
+
+@app.before_request
+def start_in_process_tasks():
+    # Every serving process (each gunicorn worker, the dev server child) keeps
+    # its own in-memory state in sync; started by its first request
+    if not app.testing:
+        start_background_tasks(in_process_tasks)
+
+@app.route('/admin/background_tasks')
+@login_required
+def background_task_status():
+    if current_user.role != 'Admin':
+        return jsonify({'error': 'Only admins can view background tasks.'}), 403
+    return jsonify([task.stats() for task in background_tasks])
+
+@app.cli.command('run-scheduler')
+def run_scheduler_command():
+    """Run the periodic background tasks in the foreground."""
+    start_background_tasks(scheduled_tasks)
+    click.echo('Running ' + ', '.join(task.name for task in scheduled_tasks) + ' (Ctrl+C to stop)')
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        for task in scheduled_tasks:
+            task.stop()
+
+@app.cli.group('tasks')
+def tasks_cli():
+    """Inspect and manage the background job queue."""
+
+@tasks_cli.command('status')
+@click.option('--failed', is_flag=True, help='List the most recent failed jobs.')
+def tasks_status_command(failed):
+    """Job counts per task and status."""
+    click.echo(f"{'task':<24}" + ''.join(f'{status:>9}' for status in STATUSES))
+    for name, counts in sorted(task_queue.counts().items()):
+        click.echo(f'{name:<24}' + ''.join(f'{counts[status]:>9}' for status in STATUSES))
+    if failed:
+        for job in task_queue.jobs(status='failed'):
+            click.echo(f"#{job['id']} {job['name']} {job['payload']} after {job['attempts']} attempts: {job['last_error']}")
+
+@tasks_cli.command('retry')
+@click.option('--name', default=None, help='Only jobs of this task.')
+def tasks_retry_command(name):
+    """Queue failed jobs again."""
+    click.echo(f'Requeued {task_queue.retry_failed(name)} jobs')
+
+@tasks_cli.command('purge')
+@click.option('--days', default=7, show_default=True)
+def tasks_purge_command(days):
+    """Delete finished jobs older than --days."""
+    click.echo(f'Deleted {task_queue.purge(days * 86400)} jobs')
+
+@tasks_cli.command('work')
+@click.option('--burst', is_flag=True, help='Run what is due, then exit.')
+def tasks_work_command(burst):
+    """Run queue workers in the foreground."""
+    if burst:
+        click.echo(f'Ran {task_queue.run_pending()} jobs')
+        return
+    task_queue.start()
+    click.echo(f'{task_queue.workers} workers running (Ctrl+C to stop)')
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        task_queue.stop()
+
+@app.cli.command('export')
+@click.argument('table', type=click.Choice(sorted(EXPORT_COLUMNS)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(FORMATS)), default='csv')
+@click.option('--department', default=None)
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), default=None)
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), default=None)
+@click.option('--gzip', 'compress', is_flag=True, help='Compress the output on the fly.')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('-o', '--output', type=click.Path(dir_okay=False), default='-', help='Defaults to stdout.')
+def export_command(table, fmt, department, date_from, date_to, compress, batch_size, output):
+    """Stream a table out as CSV or NDJSON in constant memory."""
+    chunks = export_chunks(
+        table, fmt, compress, batch_size,
+        department=department,
+        date_from=date_from.date() if date_from else None,
+        date_to=date_to.date() if date_to else None
+    )
+    with click.open_file(output, 'wb' if compress else 'w') as out:
+        for chunk in chunks:
+            out.write(chunk)
+
+@app.cli.command('import-uploads')
+@click.option('--batch-size', default=200, show_default=True)
+def import_uploads_command(batch_size):
+    """Move legacy comma-separated complaint.images files into the upload store."""
+    imported = missing = 0
+    legacy_dir = app.config['UPLOAD_FOLDER']
+    query = Complaint.query.filter(Complaint.images.isnot(None), Complaint.images != '').order_by(Complaint.id)
+    while True:
+        complaints = query.limit(batch_size).all()
+        if not complaints:
+            break
+        for complaint in complaints:
+            position = len(complaint.image_files)
+            for filename in filter(None, complaint.images.split(',')):
+                path = os.path.join(legacy_dir, filename)
+                if not os.path.isfile(path):
+                    click.echo(f'complaint {complaint.id}: {filename} not found, skipped', err=True)
+                    missing += 1
+                    continue
+                digest, size, created = upload_store.save_file(path)
+                complaint.image_files.append(ComplaintImage(
+                    digest=digest, filename=filename, size=size, position=position,
+                    content_type=mimetypes.guess_type(filename)[0]
+                ))
+                position += 1
+                imported += 1
+            complaint.images = None
+        db.session.commit()
+    click.echo(f'Imported {imported} images ({missing} missing). '
+               f'The original files in {legacy_dir} are no longer referenced and can be removed.')
+
+@app.cli.command('make-thumbnails')
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True)
+def make_thumbnails_command(workers):
+    """Render missing thumbnails and previews for every stored image."""
+    thumbnail_pipeline.workers = workers
+    digests = [digest for (digest,) in db.session.query(ComplaintImage.digest).filter(
+        db.or_(ComplaintImage.content_type.like('image/%'), ComplaintImage.content_type.is_(None))
+    ).distinct()]
+    rendered = skipped = 0
+    pending = deque()
+    start = time.perf_counter()
+
+    def collect(future):
+        nonlocal rendered, skipped
+        written = future.result()
+        if written is None:
+            skipped += 1
+        else:
+            rendered += len(written)
+
+    for digest in digests:
+        if not upload_store.exists(digest):
+            continue
+        future = thumbnail_pipeline.submit(digest)
+        if future is not None:
+            pending.append(future)
+        while len(pending) >= 2 * workers:
+            collect(pending.popleft())
+    while pending:
+        collect(pending.popleft())
+    thumbnail_pipeline.shutdown()
+    click.echo(f'Rendered {rendered} variants for {len(digests)} images in '
+               f'{time.perf_counter() - start:.2f}s ({skipped} not readable as images)')
+
+@app.cli.command('ingest-complaints')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--user-id', type=int, required=True, help='Owner of rows without a user_id.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per transaction.')
+def ingest_complaints_command(path, user_id, batch_size):
+    """Bulk-load complaints from an NDJSON file (or a JSON list if it ends in .json)."""
+    start = time.perf_counter()
+    inserted = failed = 0
+    with click.open_file(path) as source:
+        if path.endswith('.json'):
+            rows, errors = parse_json(source.read())
+        else:
+            rows, errors = parse_ndjson(source)
+    for error in errors:
+        click.echo(f"row {error['row']}: {error['error']}", err=True)
+    failed += len(errors)
+
+    for offset in range(0, len(rows), batch_size):
+        report = ingest(rows[offset:offset + batch_size], user_id, allow_user_id=True)
+        inserted += report['inserted']
+        failed += len(report['errors'])
+        for error in report['errors']:
+            click.echo(f"row {error['row']}: {error['error']}", err=True)
+    click.echo(f'Inserted {inserted} complaints, {failed} rows rejected, in {time.perf_counter() - start:.2f}s')
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recompute the statistics rollup from all feedback and complaints."""
+    start = time.perf_counter()
+    rows = stats.rebuild()
+    click.echo(f'Rebuilt {rows} rollup rows in {time.perf_counter() - start:.2f}s')
+
+@app.cli.command('rescore-urgency')
+@click.option('--department', default=None, help='Only rescore this department.')
+@click.option('--all-statuses', is_flag=True, help='Include completed complaints.')
+def rescore_urgency_command(department, all_statuses):
+    """Recompute stored urgency for the complaint backlog."""
+    query = Complaint.query
+    if department:
+        query = query.filter(Complaint.department == department)
+    if not all_statuses:
+        query = query.filter(Complaint.status == 'Unsolved')
+
+    start = time.perf_counter()
+    scanned, updated = rescore_urgency(query)
+    click.echo(f'Rescored {scanned} complaints, updated {updated} in {time.perf_counter() - start:.2f}s')
+
+def feedback_chunks(after_id, chunk_size, only_missing):
+    # Keyset walk over feedback ids; each chunk is one short indexed query
+    while True:
+        query = db.session.query(Feedback.id, Feedback.feedback_text, Feedback.sentiment).filter(Feedback.id > after_id)
+        if only_missing:
+            query = query.filter(Feedback.sentiment.is_(None))
+        rows = query.order_by(Feedback.id).limit(chunk_size).all()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1].id
+
+def write_relabelled(entry, scanned, updated, save_checkpoint, start):
+    rows, future, texts = entry
+    labels = future.result() if future else label_texts(texts)
+    changes = [
+        {'id': row.id, 'sentiment': label}
+        for row, label in zip(rows, labels) if row.sentiment != label
+    ]
+    if changes:
+        db.session.execute(db.update(Feedback), changes)  # executemany UPDATE ... WHERE id = ?
+    db.session.commit()
+    save_checkpoint(rows[-1].id)
+
+    scanned += len(rows)
+    updated += len(changes)
+    elapsed = time.perf_counter() - start
+    click.echo(f'  up to id {rows[-1].id}: {scanned} rows, {updated} changed, {scanned / elapsed:.0f} rows/s')
+    return scanned, updated
+
+@app.cli.command('relabel-sentiment')
+@click.option('--chunk-size', default=2000, show_default=True)
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True, help='Scoring processes; 1 scores inline.')
+@click.option('--only-missing', is_flag=True, help='Only rows whose sentiment is NULL.')
+@click.option('--restart', is_flag=True, help='Ignore the checkpoint and start from the first row.')
+@click.option('--no-rebuild-stats', is_flag=True, help='Skip rebuilding the statistics rollup afterwards.')
+def relabel_sentiment_command(chunk_size, workers, only_missing, restart, no_rebuild_stats):
+    """Recompute feedback sentiment in parallel, resumable from the last processed id."""
+    checkpoint = os.path.join(app.instance_path, 'relabel_sentiment.checkpoint')
+    after_id = 0
+    if not restart and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            after_id = int(f.read().strip() or 0)
+        click.echo(f'Resuming after feedback id {after_id}')
+
+    def save_checkpoint(last_id):
+        with open(checkpoint + '.tmp', 'w') as f:
+            f.write(str(last_id))
+        os.replace(checkpoint + '.tmp', checkpoint)
+
+    scanned = updated = 0
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # Keep a couple of chunks per worker in flight while results are written back in id order
+        pending = []
+        chunks = feedback_chunks(after_id, chunk_size, only_missing)
+        for rows in chunks:
+            texts = [row.feedback_text or '' for row in rows]
+            pending.append((rows, pool.submit(label_texts, texts) if pool else None, texts))
+            if len(pending) < 2 * workers:
+                continue
+            scanned, updated = write_relabelled(pending.pop(0), scanned, updated, save_checkpoint, start)
+        while pending:
+            scanned, updated = write_relabelled(pending.pop(0), scanned, updated, save_checkpoint, start)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    click.echo(f'Relabelled {scanned} feedback rows, {updated} changed, in {time.perf_counter() - start:.2f}s')
+    if updated and not no_rebuild_stats:
+        click.echo(f'Rebuilt {stats.rebuild()} rollup rows')
+
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()  # Ensure the database is initialized
+    # The debug reloader runs this block twice; only the serving child starts tasks
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks()
     socketio.run(app, debug=True)  # Use SocketIO to run the app
@@ -0,0 +1,115 @@
+import heapq
+import threading
+
+from models import db, User, Complaint
+
+
+class AssignmentIndex:
+    """Per-department min-heaps of open (Unsolved) complaint counts per employee.
+
+    Picking the least-loaded employee is a heap operation instead of a GROUP BY
+    over the complaint table. Heap entries are never updated in place: a new
+    (count, employee_id) entry is pushed and entries that no longer match the
+    employee's current count are discarded when they reach the top.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heaps = {}      # department -> [(open_count, employee_id)]
+        self._counts = {}     # employee_id -> open_count
+        self._employees = {}  # employee_id -> (department, username)
+        self._members = {}    # department -> [employee_id]
+        self.warmed = False
+
+    def load(self, rows):
+        # rows: (employee_id, username, department, open_count)
+        heaps, counts, employees, members = {}, {}, {}, {}
+        for employee_id, username, department, open_count in rows:
+            counts[employee_id] = open_count
+            employees[employee_id] = (department, username)
+            members.setdefault(department, []).append(employee_id)
+            heaps.setdefault(department, []).append((open_count, employee_id))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+
+        with self._lock:
+            drifted = sum(1 for employee_id, count in counts.items() if self._counts.get(employee_id) != count)
+            self._heaps, self._counts, self._employees, self._members = heaps, counts, employees, members
+            self.warmed = True
+        return drifted
+
+    def reconcile(self):
+        employees = (
+            db.session.query(User.id, User.username, User.department)
+            .filter(User.role == 'Employee')
+            .all()
+        )
+        open_counts = dict(
+            db.session.query(Complaint.assigned_employee_id, db.func.count(Complaint.id))
+            .filter(Complaint.status == 'Unsolved', Complaint.assigned_employee_id.isnot(None))
+            .group_by(Complaint.assigned_employee_id)
+            .all()
+        )
+        rows = [(employee_id, username, department, open_counts.get(employee_id, 0))
+                for employee_id, username, department in employees]
+        return {'employees': len(rows), 'drifted': self.load(rows)}
+
+    def warm(self):
+        if not self.warmed:
+            self.reconcile()
+
+    def pick(self, department):
+        # Returns (employee_id, username) and counts the new complaint against
+        # them, or None when the department has no employees
+        self.warm()
+        with self._lock:
+            return self._pick(department)
+
+    def pick_many(self, departments):
+        # pick() for a whole batch under one lock; each pick sees the ones before it
+        self.warm()
+        with self._lock:
+            return [self._pick(department) for department in departments]
+
+    def _pick(self, department):
+        heap = self._heaps.get(department)
+        while heap:
+            count, employee_id = heap[0]
+            if self._counts.get(employee_id) != count:
+                heapq.heappop(heap)
+                continue
+            self._counts[employee_id] = count + 1
+            heapq.heapreplace(heap, (count + 1, employee_id))
+            return employee_id, self._employees[employee_id][1]
+        return None
+
+    def release(self, employee_id):
+        # One of the employee's open complaints was solved (or never committed)
+        with self._lock:
+            if employee_id not in self._counts:
+                return
+            count = max(self._counts[employee_id] - 1, 0)
+            self._counts[employee_id] = count
+            department = self._employees[employee_id][0]
+            heap = self._heaps.setdefault(department, [])
+            heapq.heappush(heap, (count, employee_id))
+            self._compact(department)
+
+    def add_employee(self, employee_id, username, department):
+        with self._lock:
+            if not self.warmed or employee_id in self._counts:
+                return
+            self._counts[employee_id] = 0
+            self._employees[employee_id] = (department, username)
+            self._members.setdefault(department, []).append(employee_id)
+            heapq.heappush(self._heaps.setdefault(department, []), (0, employee_id))
+
+    def _compact(self, department):
+        # Releases leave stale entries behind; rebuild once they dominate
+        heap, members = self._heaps[department], self._members.get(department, [])
+        if len(heap) > 2 * len(members) + 16:
+            heap[:] = [(self._counts[employee_id], employee_id) for employee_id in members]
+            heapq.heapify(heap)
+
+
+assignment_index = AssignmentIndex()
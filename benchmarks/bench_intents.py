@@ -0,0 +1,130 @@
+# Latency and throughput of chatbot intent inference.
+#
+#   python benchmarks/bench_intents.py [--messages 5000] [--threads 16]
+#
+# "sklearn" is the old path: vectorizer.transform + model.predict per message.
+# "engine" is intent_engine.IntentEngine (single and predict_batch), also
+# called from --threads concurrent callers the way chat requests call it.
+# "cached" is SmartChatbot.predict_intent with the LRU intent cache warm. Predictions must match scikit-learn exactly; exits 1 if not.
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')  # pickles from an older scikit-learn
+
+from chatbot_engine import SmartChatbot, intent_cache, load_artifacts
+from intent_engine import IntentEngine
+
+NOISE = "please my the train is was where what when complaint 12345 coach !!".split()
+
+
+def sample_messages(intents, vocabulary, count, seed=11):
+    rng = random.Random(seed)
+    patterns = [p for intent in intents["intents"] for p in intent["patterns"]]
+    words = sorted(vocabulary) + NOISE
+    messages = list(patterns)
+    while len(messages) < count:
+        if rng.random() < 0.5:
+            messages.append(rng.choice(patterns))
+        else:
+            messages.append(' '.join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+    return messages[:count]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def per_message(fn, messages):
+    latencies = []
+    start = time.perf_counter()
+    for message in messages:
+        t = time.perf_counter()
+        fn(message)
+        latencies.append(time.perf_counter() - t)
+    return time.perf_counter() - start, latencies
+
+
+def concurrent(fn, messages, threads):
+    latencies = []
+    lock = threading.Lock()
+    chunks = [messages[i::threads] for i in range(threads)]
+
+    def worker(chunk):
+        local = []
+        for message in chunk:
+            t = time.perf_counter()
+            fn(message)
+            local.append(time.perf_counter() - t)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(name, seconds, count, latencies=None):
+    line = f"{name:<22} {count / seconds:>12.0f}"
+    if latencies:
+        line += f" {statistics.median(latencies) * 1e6:>10.1f} {percentile(latencies, 0.99) * 1e6:>10.1f}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    model, vectorizer, intents = load_artifacts()
+    engine = IntentEngine.from_model(model, vectorizer, intents)
+    messages = sample_messages(intents, vectorizer.vocabulary_, args.messages)
+
+    expected = [str(tag) for tag in model.predict(vectorizer.transform(messages))]
+    single = [engine.predict(message) for message in messages]
+    batched = engine.predict_batch(messages)
+    mismatches = sum(1 for e, s, b in zip(expected, single, batched) if not e == s == b)
+    print(f"parity: {len(messages) - mismatches}/{len(messages)} predictions match scikit-learn")
+
+    print(f"\n{'path':<22} {'msgs/s':>12} {'p50 us':>10} {'p99 us':>10}")
+    seconds, latencies = per_message(lambda m: model.predict(vectorizer.transform([m])), messages)
+    report('sklearn per message', seconds, len(messages), latencies)
+    seconds, latencies = per_message(engine.predict, messages)
+    report('engine per message', seconds, len(messages), latencies)
+
+    start = time.perf_counter()
+    for i in range(0, len(messages), 64):
+        engine.predict_batch(messages[i:i + 64])
+    report('engine batches of 64', time.perf_counter() - start, len(messages))
+
+    seconds, latencies = concurrent(engine.predict, messages, args.threads)
+    report(f'engine x{args.threads} threads', seconds, len(messages), latencies)
+
+    bot = SmartChatbot()
+    for message in messages:
+        bot.predict_intent(message)
+    warm = intent_cache.stats()
+    seconds, latencies = per_message(bot.predict_intent, messages)
+    report('cached per message', seconds, len(messages), latencies)
+    print(f"cache after warm-up: {warm['entries']} entries, hit rate {warm['hit_rate']:.0%}")
+    mismatches += sum(1 for e, message in zip(expected, messages) if bot.predict_intent(message) != e)
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# Label regression and throughput of sentiment.SentimentAnalyzer vs TextBlob.
+#
+#   python benchmarks/bench_sentiment.py [--texts 5000] [--words 30]
+#
+# Every line of sentiment_corpus.tsv must get its recorded label. When TextBlob
+# is installed, polarity is also compared exactly on synthetic feedback built
+# from the lexicon, and both paths are timed. Exits 1 on any mismatch.
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment import analyzer
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sentiment_corpus.tsv')
+
+GLUE = ("the train staff was is not no never very really and but coach food "
+        "don't isn't ! ... , . :) :( (!) ; ) etc. Mr.").split()
+
+
+def load_corpus():
+    with open(CORPUS, encoding='utf-8') as f:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                label, text = line.rstrip('\n').split('\t', 1)
+                yield label, text.replace('\\n', '\n')
+
+
+def synthetic_texts(count, words, seed=7):
+    rng = random.Random(seed)
+    vocabulary = sorted(analyzer.lexicon)
+    return [
+        ' '.join(rng.choice(vocabulary) if rng.random() < 0.4 else rng.choice(GLUE)
+                 for _ in range(rng.randint(1, words)))
+        for _ in range(count)
+    ]
+
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    result = fn(texts)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--texts', type=int, default=5000)
+    parser.add_argument('--words', type=int, default=30)
+    args = parser.parse_args()
+
+    failures = 0
+    corpus = list(load_corpus())
+    for (expected, text), label in zip(corpus, analyzer.label_batch([text for _, text in corpus])):
+        if label != expected:
+            failures += 1
+            print(f"corpus mismatch: {text!r} expected {expected}, got {label}")
+    print(f"corpus: {len(corpus) - failures}/{len(corpus)} labels match")
+
+    try:
+        from textblob import TextBlob
+    except ImportError:
+        print("textblob not installed, skipping the comparison")
+        sys.exit(1 if failures else 0)
+
+    texts = synthetic_texts(args.texts, args.words)
+    TextBlob('warm up').sentiment  # lexicon load is not part of the per-text cost
+
+    expected, textblob_s = timed(lambda ts: [TextBlob(t).sentiment.polarity for t in ts], texts)
+    got, engine_s = timed(lambda ts: [analyzer.polarity(t) for t in ts], texts)
+    mismatches = sum(1 for a, b in zip(expected, got) if a != b)
+    failures += mismatches
+
+    print(f"synthetic: {len(texts) - mismatches}/{len(texts)} polarities identical")
+    print(f"{'engine':<10} {'texts/s':>12} {'us/text':>10}")
+    for name, seconds in (('textblob', textblob_s), ('lexicon', engine_s)):
+        print(f"{name:<10} {len(texts) / seconds:>12.0f} {seconds / len(texts) * 1e6:>10.1f}")
+    print(f"speedup: {textblob_s / engine_s:.1f}x")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Per-complaint latency of the urgency keyword scoring on long complaint texts.
+#
+#   python benchmarks/bench_urgency.py [--words 2000] [--complaints 500]
+#
+# "legacy" is the old calculate_urgency loop: rebuild the keyword dict and run
+# one substring scan per keyword. "compiled" is urgency.KeywordScorer.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from urgency import KEYWORDS_PATH, scorer
+
+FILLER = ("the train was at the platform and passengers were waiting near coach "
+          "with their bags while the announcement said something about the next "
+          "station and the ticket checker walked past the berth").split()
+
+
+def legacy_impact_score(text, table):
+    keywords_scores = dict(table)
+    impact_score = 1
+    for keyword, score in keywords_scores.items():
+        if keyword in text.lower():
+            impact_score = score
+            break
+    return impact_score
+
+
+def make_texts(count, words, keywords, rng):
+    texts = []
+    for _ in range(count):
+        body = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(3):
+            body.insert(rng.randrange(len(body)), rng.choice(keywords))
+        texts.append(' '.join(body))
+    return texts
+
+
+def run(label, fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed / len(texts) * 1e6:10.1f} us/complaint   {len(texts) / elapsed:10.0f} complaints/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', type=int, default=2000)
+    parser.add_argument('--complaints', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with open(KEYWORDS_PATH) as f:
+        table = json.load(f)['keywords']
+
+    texts = make_texts(args.complaints, args.words, list(table), random.Random(args.seed))
+    print(f"{args.complaints} complaints x ~{args.words} words, {len(table)} keywords")
+    run('legacy', lambda text: legacy_impact_score(text, table), texts)
+    run('compiled', scorer.impact_score, texts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# Fails if a dashboard query falls back to a full table scan.
+#
+#   python benchmarks/check_query_plans.py [--complaints 50000]
+#
+# Builds a throwaway SQLite database from the models (including their
+# indexes), seeds it with a production-sized backlog, runs ANALYZE and then
+# checks EXPLAIN QUERY PLAN for every hot query the dashboards issue.
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert, tuple_
+
+from models import db, User, Complaint, Feedback, StatsRollup
+
+DEPARTMENTS = ["Safety and Security", "Medical Assistance", "Cleaning and Maintenance", "Lost and Found",
+               "Food Services", "Passenger Services", "Ticket Booking", "Reservation", "Customer Support"]
+
+# "SCAN complaint" without an index is a full table walk
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)')
+
+
+def seed(complaints, rng):
+    users = [dict(id=i, username=f'user{i}', password='x', role='User', department=None) for i in range(1, 2001)]
+    users += [dict(id=len(users) + i + 1, username=f'emp{i}', password='x', role='Employee',
+                   department=DEPARTMENTS[i % len(DEPARTMENTS)]) for i in range(200)]
+    users += [dict(id=len(users) + i + 1, username=f'admin{i}', password='x', role='Admin',
+                   department=DEPARTMENTS[i]) for i in range(len(DEPARTMENTS))]
+    db.session.execute(insert(User), users)
+
+    employees = [u for u in users if u['role'] == 'Employee']
+    now = datetime.now()
+    rows, feedbacks = [], []
+    for i in range(1, complaints + 1):
+        employee = rng.choice(employees)
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        status = 'Completed' if rng.random() < 0.7 else 'Unsolved'
+        rows.append(dict(id=i, unique_id=str(i), department=employee['department'], date=created.date(),
+                         time=created.time(), pnr_no='1234567890', age=rng.randint(5, 90),
+                         additional_info='seeded complaint', images='', status=status,
+                         urgency=rng.randint(1, 40), user_id=rng.randint(1, 2000),
+                         assigned_employee_id=employee['id']))
+        if status == 'Completed' and rng.random() < 0.6:
+            feedbacks.append(dict(complaint_id=i, feedback_text='seeded feedback',
+                                  sentiment=rng.choice(['Positive', 'Neutral', 'Negative']),
+                                  rating=rng.randint(1, 5), created_at=created + timedelta(days=1)))
+    db.session.execute(insert(Complaint), rows)
+    db.session.execute(insert(Feedback.__table__), feedbacks)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+def dashboard_queries():
+    department = DEPARTMENTS[0]
+    employee_id = User.query.filter_by(role='Employee', department=department).first().id
+    since = datetime.now() - timedelta(hours=6)
+
+    return {
+        'user_dashboard': Complaint.query.filter_by(user_id=42)
+            .order_by(Complaint.date.desc(), Complaint.time.desc(), Complaint.id.desc()),
+        'track_complaints': Complaint.query.filter(
+            (Complaint.user_id == 42) &
+            ((Complaint.status == 'Unsolved') | (~Complaint.feedbacks.any()))),
+        'admin_dashboard': Complaint.query.filter_by(department=department)
+            .order_by(Complaint.urgency.desc(), Complaint.id.desc()),
+        'admin_feedback_stats': db.session.query(db.func.date(Feedback.created_at), Feedback.sentiment,
+                                                 db.func.count(Feedback.id), db.func.sum(Feedback.rating))
+            .join(Complaint).filter(Complaint.department == department)
+            .group_by(db.func.date(Feedback.created_at), Feedback.sentiment),
+        'existing_feedback': Feedback.query.filter_by(complaint_id=7),
+        'view_employees': User.query.filter_by(role='Employee', department=department),
+        'employee_dashboard': Complaint.query.filter_by(assigned_employee_id=employee_id)
+            .order_by(Complaint.urgency.desc()),
+        'assignment_employees': db.session.query(User.id, User.username, User.department)
+            .filter(User.role == 'Employee'),
+        'assignment_open_counts': db.session.query(Complaint.assigned_employee_id, db.func.count(Complaint.id))
+            .filter(Complaint.status == 'Unsolved', Complaint.assigned_employee_id.isnot(None))
+            .group_by(Complaint.assigned_employee_id),
+        'urgency_rescore': Complaint.query.filter(Complaint.status == 'Unsolved',
+                                                  Complaint.date >= since.date()),
+        'feedback_since': Feedback.query.filter(Feedback.created_at >= since),
+        'stats_daily': StatsRollup.query.filter_by(scope='day', department=department).order_by(StatsRollup.key),
+        # Deep keyset pages must stay index range scans
+        'admin_dashboard_page': Complaint.query.filter_by(department=department)
+            .filter(tuple_(Complaint.urgency, Complaint.id) < tuple_(20, 25000))
+            .order_by(Complaint.urgency.desc(), Complaint.id.desc()).limit(51),
+        'employee_dashboard_page': Complaint.query.filter_by(assigned_employee_id=employee_id)
+            .filter(tuple_(Complaint.urgency, Complaint.id) < tuple_(20, 25000))
+            .order_by(Complaint.urgency.desc(), Complaint.id.desc()).limit(51),
+        'user_dashboard_page': Complaint.query.filter_by(user_id=42)
+            .filter(tuple_(Complaint.date, Complaint.time, Complaint.id) < tuple_(since.date(), since.time(), 25000))
+            .order_by(Complaint.date.desc(), Complaint.time.desc(), Complaint.id.desc()).limit(51),
+    }
+
+
+def explain(query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {statement}'))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--complaints', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tmp, 'plans.db')
+        db.init_app(app)
+
+        with app.app_context():
+            db.create_all()
+            seed(args.complaints, random.Random(args.seed))
+
+            failures = 0
+            for name, query in dashboard_queries().items():
+                plan = explain(query)
+                scans = [line for line in plan if FULL_SCAN.search(line)]
+                failures += bool(scans)
+                print(f"{'FAIL' if scans else 'ok':<5} {name}")
+                for line in plan:
+                    print(f"        {line}")
+            db.session.remove()
+
+    if failures:
+        print(f"{failures} queries fall back to a full table scan")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Cold-start profile of `import app`, using the interpreter's -X importtime.
+#
+#   python benchmarks/startup_profile.py [--runs 3] [--top 20] [--target-ms 1500]
+#
+# Prints the slowest imports (cumulative, best of --runs) and fails if the app
+# import exceeds the target or if a heavy dependency that should only load on
+# first use (charts, sentiment, chatbot) was imported at startup.
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of the startup path
+LAZY = ('matplotlib', 'textblob', 'nltk', 'sklearn', 'scipy', 'numpy', 'PIL')
+
+
+def profile_once():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(self_us.split(':')[1]), int(cumulative_us), depth))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--target-ms', type=float, default=1500)
+    args = parser.parse_args()
+
+    # Best of N: the first run also pays for writing .pyc files
+    runs = [profile_once() for _ in range(args.runs)]
+    imports = min(runs, key=lambda run: next(c for name, s, c, d in run if name == 'app'))
+    total_ms = next(c for name, s, c, d in imports if name == 'app') / 1000
+
+    print(f"{'module':<50} {'self ms':>9} {'cumulative ms':>14}")
+    direct = [entry for entry in imports if entry[3] <= 1]
+    for name, self_us, cumulative_us, depth in sorted(direct, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"{'  ' * depth + name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+
+    eager = sorted({name.split('.')[0] for name, s, c, d in imports if name.split('.')[0] in LAZY})
+    print(f"\nimport app: {total_ms:.0f} ms (target {args.target_ms:.0f} ms)")
+    if eager:
+        print(f"eagerly imported: {', '.join(eager)}")
+
+    if total_ms > args.target_ms or eager:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
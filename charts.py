@@ -0,0 +1,77 @@
+import base64
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ChartRenderer:
+    # Feedback trend charts as base64 PNG, cached by (department, data version)
+    # with LRU eviction. Renders run on a small worker pool and each worker
+    # reuses one Agg figure, so pyplot's global figure registry is never used.
+
+    def __init__(self, max_entries=128, workers=2):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chart-render')
+
+    def trend_graph(self, department, version, trend_data, timeout=30):
+        key = (department, version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            # Concurrent requests for the same chart share one render
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._render, key, list(trend_data))
+                self._pending[key] = future
+        return future.result(timeout)
+
+    def _figure(self):
+        figure = getattr(self._local, 'figure', None)
+        if figure is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+            figure = Figure(figsize=(10, 5))
+            FigureCanvasAgg(figure)
+            self._local.figure = figure
+        return figure
+
+    def _render(self, key, trend_data):
+        try:
+            months = [data[0] for data in trend_data]
+            counts = [data[1] for data in trend_data]
+
+            figure = self._figure()
+            figure.clf()
+            ax = figure.add_subplot()
+            ax.plot(months, counts, marker='o', color='b')
+            ax.set_title("Feedback Trend Over Time")
+            ax.set_xlabel("Month")
+            ax.set_ylabel("Number of Feedbacks")
+
+            img = io.BytesIO()
+            figure.savefig(img, format='png')
+            plot_url = base64.b64encode(img.getvalue()).decode('utf8')
+
+            with self._lock:
+                self._cache[key] = plot_url
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return plot_url
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache), 'hits': self.hits, 'misses': self.misses}
@@ -1,40 +1,248 @@
+import json
+import logging
+import os
 import pickle
 import random
 import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from collections import OrderedDict
+
+import idgen
+
+# Trained engines are published as versioned directories under ARTIFACTS_DIR,
+# with CURRENT naming the live one. Workers re-check CURRENT every
+# CHECK_INTERVAL seconds and swap a new version in between batches; without
+# any published version the legacy pickles are used. Loading pulls in
+# scikit-learn/joblib, so it happens on the first message, not at import.
+ARTIFACTS_DIR = os.environ.get("CHATBOT_ARTIFACTS_DIR", "artifacts")
+CHECK_INTERVAL = 5.0
+
+logger = logging.getLogger(__name__)
+
+_engine = None
+_next_check = 0.0
+_engine_lock = threading.Lock()
+
+
+def load_artifacts():
+    with open("model.pkl","rb") as f:
+        model = pickle.load(f)
+    with open("vectorizer.pkl","rb") as f:
+        vectorizer = pickle.load(f)
+    with open("intents.pkl","rb") as f:
+        intents = pickle.load(f)
+    return model, vectorizer, intents
+
+
+def current_version():
+    try:
+        with open(os.path.join(ARTIFACTS_DIR, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _load(version):
+    from intent_engine import IntentEngine
+    if version is None:
+        return IntentEngine.from_model(*load_artifacts())
+    return IntentEngine.load(os.path.join(ARTIFACTS_DIR, version), version)
+
+
+def load_engine():
+    global _engine, _next_check
+    engine = _engine
+    if engine is not None and time.monotonic() < _next_check:
+        return engine
+    # Requests never wait on a swap: if another thread is loading, keep serving the old engine
+    if not _engine_lock.acquire(blocking=engine is None):
+        return engine
+    try:
+        if _engine is None or time.monotonic() >= _next_check:
+            _next_check = time.monotonic() + CHECK_INTERVAL
+            version = current_version()
+            if _engine is None or (version is not None and version != _engine.version):
+                try:
+                    _engine = _load(version)
+                except Exception:
+                    if _engine is None:
+                        raise
+                    logger.exception("Could not load chatbot model %s, keeping %s", version, _engine.version)
+                else:
+                    intent_cache.clear()
+        return _engine
+    finally:
+        _engine_lock.release()
+
+
+def reload_engine():
+    # Check CURRENT now instead of waiting for the next poll
+    global _next_check
+    _next_check = 0.0
+    return load_engine()
+
+
+def publish_engine(engine, metadata=None, keep=3):
+    # Written to a staging directory, renamed into place, then CURRENT is
+    # replaced atomically, so workers only ever see complete versions
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    staging = os.path.join(ARTIFACTS_DIR, f".staging-{version}")
+    os.makedirs(staging)
+    engine.save(staging)
+    with open(os.path.join(staging, "manifest.json"), "w") as f:
+        json.dump({"version": version, "created_at": datetime.utcnow().isoformat(), **(metadata or {})}, f, indent=2)
+    os.rename(staging, os.path.join(ARTIFACTS_DIR, version))
+
+    pointer = os.path.join(ARTIFACTS_DIR, "CURRENT.tmp")
+    with open(pointer, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, os.path.join(ARTIFACTS_DIR, "CURRENT"))
+
+    # Older versions are removed; workers still mapping one keep their open mapping.
+    # Only published versions count: the directory also holds the feature cache
+    # and the training log.
+    versions = sorted(
+        name for name in os.listdir(ARTIFACTS_DIR)
+        if not name.startswith(".") and os.path.isfile(os.path.join(ARTIFACTS_DIR, name, "manifest.json"))
+    )
+    for old in versions[:-keep]:
+        if old != version:
+            shutil.rmtree(os.path.join(ARTIFACTS_DIR, old), ignore_errors=True)
+    return version
+
+
+class IntentCache:
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            intent = self._entries.get(key)
+            if intent is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return intent
+
+    def put(self, key, intent):
+        with self._lock:
+            self._entries[key] = intent
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+            }
+
+
+# Most traffic is a few hundred phrases ("hi", "track my complaint", "thanks")
+intent_cache = IntentCache()
+
+# A complaint is referenced by its tracking number (unique_id, 13 base32
+# characters from idgen such as "06DQ2ZK1R0G04", any case), by a tracking
+# number issued before those (e.g. "1770719199.349631") or by its numeric id
+# ("complaint 12", "#12"). Longer bare numbers such as 10-digit PNRs are not
+# complaint ids, and a 13-character word only counts as a tracking number if
+# it decodes to a plausible issue time ("3rdclasscoach" does not).
+TRACKING_ID_RE = re.compile(r'(?<![0-9A-Za-z])[0-7][0-9A-TV-Z]{12}(?![0-9A-Za-z])', re.IGNORECASE)
+LEGACY_ID_RE = re.compile(r'(?<![\d.])\d{10}\.\d{1,6}(?!\d)')
+NUMERIC_ID_RE = re.compile(r'(?<![\w.])\d{1,9}(?!\w|\.\d)')
 
-model = pickle.load(open("model.pkl","rb"))
-vectorizer = pickle.load(open("vectorizer.pkl","rb"))
-intents = pickle.load(open("intents.pkl","rb"))
 
 class SmartChatbot:
 
+    def __init__(self, status_lookup=None):
+        # status_lookup(reference, viewer) -> dict with unique_id, status,
+        # urgency and department, or None if unknown / not visible to viewer
+        self.status_lookup = status_lookup
+
+    def predict_batch(self,messages):
+
+        # For bulk and offline callers; chat scores one message at a time
+        return load_engine().predict_batch(messages)
+
     def predict_intent(self,message):
 
-        X = vectorizer.transform([message])
-        intent = model.predict(X)[0]
+        engine = load_engine()
+        key = (engine.version, engine.normalize(message))
+        intent = intent_cache.get(key)
+        if intent is None:
+            # Directly: a queue and Future handoff to batch concurrent
+            # messages cost more than a ~20us dot product saves
+            intent = engine.predict(message)
+            intent_cache.put(key, intent)
 
         return intent
 
+    def stats(self):
+
+        return {
+            'model_version': _engine.version if _engine else None,
+            'cache': intent_cache.stats(),
+        }
+
     def detect_complaint_id(self,message):
 
-        match = re.search(r'\d+',message)
+        for match in TRACKING_ID_RE.finditer(message):
+            if idgen.is_plausible(match.group()):
+                return idgen.normalize(match.group())
+
+        match = LEGACY_ID_RE.search(message) or NUMERIC_ID_RE.search(message)
 
         if match:
             return match.group()
 
         return None
 
-    def generate_response(self,message):
+    def track_response(self,complaint_id,viewer):
+
+        if self.status_lookup is None:
+            return f"I found complaint ID {complaint_id}. Checking status..."
+
+        if viewer is None:
+            return f"Please log in to check the status of complaint {complaint_id}."
+
+        complaint = self.status_lookup(complaint_id, viewer)
+        if complaint is None:
+            return f"I couldn't find complaint {complaint_id} among your complaints. Please check the number."
+
+        return (f"Complaint {complaint['unique_id']} ({complaint['department']}) is "
+                f"{complaint['status']}, with urgency {complaint['urgency']}.")
+
+    def generate_response(self,message,viewer=None):
 
         intent = self.predict_intent(message)
 
         complaint_id = self.detect_complaint_id(message)
 
         if intent == "track" and complaint_id:
-            return f"I found complaint ID {complaint_id}. Checking status..."
+            return self.track_response(complaint_id, viewer)
 
-        for i in intents["intents"]:
-            if i["tag"] == intent:
-                return random.choice(i["responses"])
+        responses = load_engine().responses.get(intent)
+        if responses:
+            return random.choice(responses)
 
         return "Sorry I didn't understand."
\ No newline at end of file
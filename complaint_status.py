@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class ComplaintStatusCache:
+    """Read-through cache in front of `loader(reference)` for chatbot status
+    lookups. Entries (including "not found") live for `ttl` seconds, the
+    least recently used are evicted beyond `max_entries`, and writers call
+    invalidate() when a complaint changes so chat never shows a stale status.
+    """
+
+    def __init__(self, loader, ttl=30, max_entries=4096):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # reference -> (expires_at, snapshot or None)
+        self._lock = threading.Lock()
+
+    def get(self, reference):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(reference, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._entries.move_to_end(reference)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        snapshot = self.loader(reference)
+        with self._lock:
+            self._entries[reference] = (now + self.ttl, snapshot)
+            self._entries.move_to_end(reference)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, *references):
+        with self._lock:
+            for reference in references:
+                self._entries.pop(str(reference), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class ConversationStore:
+    """Recent chat turns per socket session, bounded in every direction.
+
+    Each session keeps at most `max_turns` messages of at most `max_chars`
+    characters. Sessions idle for longer than `ttl` seconds expire, and
+    beyond `max_sessions` the least recently active one is evicted. Sessions
+    are kept in activity order, so expiry only ever looks at the front.
+    """
+
+    def __init__(self, max_sessions=10000, max_turns=20, max_chars=500, ttl=1800):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.max_chars = max_chars
+        self.ttl = ttl
+        self.evicted = 0
+        self.expired = 0
+        self._sessions = OrderedDict()  # sid -> (last_seen, deque of (role, text))
+        self._lock = threading.Lock()
+
+    def append(self, sid, role, text):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(sid, None)
+            turns = entry[1] if entry else deque(maxlen=self.max_turns)
+            turns.append((role, text[:self.max_chars]))
+            self._sessions[sid] = (now, turns)
+            self._expire(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+
+    def discard(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def _expire(self, now):
+        while self._sessions:
+            sid, (last_seen, turns) = next(iter(self._sessions.items()))
+            if now - last_seen <= self.ttl:
+                break
+            del self._sessions[sid]
+            self.expired += 1
+
+    def purge_expired(self):
+        with self._lock:
+            before = len(self._sessions)
+            self._expire(time.monotonic())
+            return before - len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'turns': sum(len(turns) for last_seen, turns in self._sessions.values()),
+                'evicted': self.evicted,
+                'expired': self.expired,
+            }
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import zlib
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from models import db, User, Complaint, Feedback, ComplaintImage
+
+def image_digests():
+    # Space-separated sha256 digests of a complaint's attachments, in upload order
+    dialect = db.engine.dialect
+    if dialect.name == 'sqlite' and dialect.server_version_info < (3, 44):
+        # No ORDER BY inside aggregates before SQLite 3.44; group_concat keeps
+        # the order rows come out of an ordered subquery instead
+        ordered = (
+            select(ComplaintImage.digest)
+            .where(ComplaintImage.complaint_id == Complaint.id)
+            .order_by(ComplaintImage.position)
+            .correlate(Complaint)
+            .subquery()
+        )
+        aggregate = select(db.func.group_concat(ordered.c.digest, ' '))
+    else:
+        # string_agg(... ORDER BY position) on PostgreSQL, group_concat on SQLite
+        aggregate = (
+            select(db.func.aggregate_strings(ComplaintImage.digest, ' ').aggregate_order_by(ComplaintImage.position))
+            .where(ComplaintImage.complaint_id == Complaint.id)
+            .correlate(Complaint)
+        )
+    return aggregate.scalar_subquery().label('image_digests')
+
+# Exported columns per table; password hashes are never exported. Functions
+# build columns whose SQL depends on the database, once per export
+EXPORT_COLUMNS = {
+    'users': [User.id, User.username, User.role, User.department],
+    'complaints': [
+        Complaint.id, Complaint.unique_id, Complaint.department, Complaint.date, Complaint.time,
+        Complaint.pnr_no, Complaint.age, Complaint.additional_info, image_digests, Complaint.status,
+        Complaint.urgency, Complaint.user_id, Complaint.assigned_employee_id
+    ],
+    'feedback': [
+        Feedback.id, Feedback.complaint_id, Feedback.feedback_text, Feedback.status,
+        Feedback.sentiment, Feedback.rating, Feedback.created_at
+    ],
+}
+
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def export_columns(table):
+    return [column() if callable(column) else column for column in EXPORT_COLUMNS[table]]
+
+
+def export_statement(table, department=None, date_from=None, date_to=None):
+    # date_from/date_to are inclusive dates; users have no date to filter on
+    statement = select(*export_columns(table))
+
+    if table == 'users':
+        if department:
+            statement = statement.where(User.department == department)
+        return statement.order_by(User.id)
+
+    if table == 'complaints':
+        if department:
+            statement = statement.where(Complaint.department == department)
+        if date_from:
+            statement = statement.where(Complaint.date >= date_from)
+        if date_to:
+            statement = statement.where(Complaint.date <= date_to)
+        return statement.order_by(Complaint.id)
+
+    if department:
+        statement = statement.join(Complaint, Feedback.complaint_id == Complaint.id).where(Complaint.department == department)
+    if date_from:
+        statement = statement.where(Feedback.created_at >= date_from)
+    if date_to:
+        statement = statement.where(Feedback.created_at < date_to + timedelta(days=1))
+    return statement.order_by(Feedback.id)
+
+
+def iter_rows(statement, batch_size=1000):
+    # Server-side cursor: rows are fetched batch_size at a time, never all at once
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield partition
+
+
+def _json_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def iter_csv(header, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(header, partitions):
+    for rows in partitions:
+        yield ''.join(
+            json.dumps(dict(zip(header, map(_json_value, row))), ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(table, fmt='csv', compress=False, batch_size=1000, **filters):
+    # Yields str chunks, or gzip-compressed bytes when compress is set
+    statement = export_statement(table, **filters)
+    header = [column.key for column in statement.selected_columns]
+    partitions = iter_rows(statement, batch_size)
+    chunks = iter_csv(header, partitions) if fmt == 'csv' else iter_ndjson(header, partitions)
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,217 @@
+import atexit
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from models import db, IdWorkerLease
+
+# Crockford base32: no I, L, O or U, so ids survive being read out or retyped
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+_DECODE.update({'I': 1, 'L': 1, 'O': 0})
+
+# 64-bit layout: milliseconds since the Unix epoch | worker | per-millisecond sequence
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+LENGTH = 13  # 65 bits of base32, fixed width so text order is time order
+
+# Tracking numbers are never older than this (2020-01-01) nor from the future,
+# which rules out most ordinary 13-letter words typed to the chatbot
+EARLIEST_MS = 1_577_836_800_000
+CLOCK_SLACK_MS = 60_000
+
+
+def encode(value):
+    chars = []
+    for _ in range(LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def decode(text):
+    value = 0
+    for char in text.upper():
+        if char not in _DECODE:
+            raise ValueError(f'not a complaint id: {text!r}')
+        value = value * 32 + _DECODE[char]
+    return value
+
+
+def normalize(text):
+    # Canonical form of a hand-typed id (lower case, I/L for 1, O for 0)
+    if len(text) != LENGTH:
+        raise ValueError(f'not a complaint id: {text!r}')
+    return encode(decode(text))
+
+
+def timestamp_ms(text):
+    return decode(text) >> (WORKER_BITS + SEQUENCE_BITS)
+
+
+def is_plausible(text, now=None):
+    # Whether a 13-character candidate decodes to a time an id could have been issued
+    try:
+        issued = timestamp_ms(normalize(text))
+    except ValueError:
+        return False
+    now_ms = int((time.time() if now is None else now) * 1000)
+    return EARLIEST_MS <= issued <= now_ms + CLOCK_SLACK_MS
+
+
+def _utc(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+class WorkerLease:
+    """Worker ids handed out through rows of the id_worker_lease table.
+
+    A process claims the lowest id that no live process holds and renews its
+    lease once half of `ttl` has passed. Ids are only generated under a lease
+    the process still holds, and one that lapsed and was taken over is given
+    up for a fresh claim, so two processes never share a worker id. A forked
+    child claims its own. Needs an application context on first use.
+    """
+
+    def __init__(self, ttl=600, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self._pid = None
+        self._owner = None
+        self._worker = None
+        self._renew_at = 0
+        self._engine = None
+
+    def worker_id(self):
+        now = self.clock()
+        if os.getpid() != self._pid:
+            # First use, or a forked worker that must not reuse its parent's id
+            self._claim(now)
+        elif now >= self._renew_at and not self._renew(now):
+            self._claim(now)
+        return self._worker
+
+    def _held(self, now):
+        self._renew_at = now + self.ttl / 2
+        return _utc(now + self.ttl)
+
+    def _renew(self, now):
+        table = IdWorkerLease.__table__
+        with self._engine.begin() as conn:
+            renewed = conn.execute(
+                table.update()
+                .where(table.c.worker_id == self._worker, table.c.owner == self._owner)
+                .values(expires_at=self._held(now))
+            ).rowcount
+        return renewed == 1
+
+    def _claim(self, now):
+        table = IdWorkerLease.__table__
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._owner = f'{socket.gethostname()[:80]}:{self._pid}:{uuid.uuid4().hex[:12]}'
+            self._engine = db.engine
+            atexit.register(self.release)
+        while True:
+            cutoff = _utc(now)
+            try:
+                with self._engine.begin() as conn:
+                    leases = dict(conn.execute(db.select(table.c.worker_id, table.c.expires_at)).all())
+                    free = [worker for worker in range(MAX_WORKER + 1) if leases.get(worker, cutoff) <= cutoff]
+                    if not free:
+                        raise RuntimeError(f'all {MAX_WORKER + 1} complaint id workers are leased')
+                    worker = free[0]
+                    values = {'owner': self._owner, 'expires_at': self._held(now)}
+                    if worker in leases:
+                        # Taking over a lapsed lease; lost if another process got there first
+                        claimed = conn.execute(
+                            table.update()
+                            .where(table.c.worker_id == worker, table.c.expires_at <= cutoff)
+                            .values(**values)
+                        ).rowcount == 1
+                    else:
+                        conn.execute(table.insert().values(worker_id=worker, **values))
+                        claimed = True
+            except IntegrityError:
+                claimed = False  # another process inserted the same id
+            if claimed:
+                self._worker = worker
+                return
+            now = self.clock()
+
+    def release(self):
+        # Lets the id be claimed straight away instead of after the lease runs out
+        if self._pid != os.getpid() or self._worker is None:
+            return
+        table = IdWorkerLease.__table__
+        try:
+            with self._engine.begin() as conn:
+                conn.execute(
+                    table.update()
+                    .where(table.c.worker_id == self._worker, table.c.owner == self._owner)
+                    .values(expires_at=_utc(self.clock()))
+                )
+        except SQLAlchemyError:
+            pass  # the lease simply runs out
+        self._worker = None
+
+
+class IdGenerator:
+    """Time-ordered 64-bit ids in the style of Snowflake, as 13 base32 chars.
+
+    Ids from one generator are strictly increasing, so inserts always land at
+    the right-hand end of the unique index. Up to 4096 ids per millisecond are
+    handed out per worker; past that, or if the clock steps back, the
+    generator runs ahead on its own clock instead of waiting. Distinct
+    processes need distinct worker ids: set COMPLAINT_ID_WORKER (0-1023) when
+    only one process files complaints, or pass a WorkerLease.
+    """
+
+    def __init__(self, worker_id=None, clock=time.time, lease=None):
+        if worker_id is None and os.environ.get('COMPLAINT_ID_WORKER'):
+            worker_id = int(os.environ['COMPLAINT_ID_WORKER'])
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER:
+            raise ValueError(f'worker id must be between 0 and {MAX_WORKER}')
+        self._explicit_worker = worker_id
+        self.lease = lease
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    @property
+    def worker_id(self):
+        if self._explicit_worker is not None:
+            return self._explicit_worker
+        if self.lease is None:
+            raise RuntimeError('no worker id: set COMPLAINT_ID_WORKER or give the generator a WorkerLease')
+        return self.lease.worker_id()
+
+    def next_id(self):
+        return self.next_ids(1)[0]
+
+    def next_ids(self, count):
+        with self._lock:
+            worker = self.worker_id
+            now_ms = int(self.clock() * 1000)
+            if now_ms > self._last_ms:
+                self._last_ms, self._sequence = now_ms, -1
+            ids = []
+            for _ in range(count):
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    self._last_ms, self._sequence = self._last_ms + 1, 0
+                ids.append(encode(
+                    (self._last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (worker << SEQUENCE_BITS) | self._sequence
+                ))
+            return ids
+
+
+complaint_ids = IdGenerator(lease=WorkerLease())
@@ -0,0 +1,179 @@
+import json
+from datetime import datetime
+
+from assignment import assignment_index
+from idgen import complaint_ids
+from models import db, User, Complaint
+from urgency import score_batch
+
+DEPARTMENTS = (
+    'Ticket Booking', 'Passenger Services', 'Lost and Found', 'Complaints', 'Safety and Security',
+    'Train Operations', 'Cleaning and Maintenance', 'Food Services', 'Reservation', 'Customer Support',
+)
+
+FIELDS = {'department', 'pnr_no', 'age', 'additional_info', 'user_id', 'created_at'}
+
+
+def parse_ndjson(lines, limit=None):
+    # One complaint object per line; rows keep their 1-based line number.
+    # Stops reading once more than `limit` rows are seen, so an oversized
+    # upload is rejected without parsing (or receiving) the rest of it.
+    rows, errors = [], []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            rows.append((number, json.loads(line)))
+        except ValueError as exc:
+            errors.append({'row': number, 'error': f'invalid JSON: {exc}'})
+        if limit is not None and len(rows) + len(errors) > limit:
+            break
+    return rows, errors
+
+
+def parse_json(text):
+    # A list of complaint objects, or {"complaints": [...]}
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get('complaints')
+    if not isinstance(data, list):
+        raise ValueError('expected a list of complaints or {"complaints": [...]}')
+    return list(enumerate(data, 1)), []
+
+
+def validate(row, default_user_id, allow_user_id, now):
+    # Returns (clean row, None) or (None, error message)
+    if not isinstance(row, dict):
+        return None, 'expected an object'
+    unknown = set(row) - FIELDS
+    if unknown:
+        return None, f"unknown fields: {', '.join(sorted(unknown))}"
+
+    department = row.get('department')
+    if department not in DEPARTMENTS:
+        return None, f'unknown department: {department!r}'
+
+    pnr_no = row.get('pnr_no')
+    if isinstance(pnr_no, int) and not isinstance(pnr_no, bool):
+        pnr_no = str(pnr_no)
+    if not isinstance(pnr_no, str) or not pnr_no.strip():
+        return None, 'pnr_no is required'
+
+    age = row.get('age')
+    if isinstance(age, str) and age.strip().isdigit():
+        age = int(age)
+    if not isinstance(age, int) or isinstance(age, bool) or not 0 <= age <= 130:
+        return None, 'age must be a whole number between 0 and 130'
+
+    additional_info = row.get('additional_info') or ''
+    if not isinstance(additional_info, str):
+        return None, 'additional_info must be a string'
+
+    user_id = row.get('user_id', default_user_id)
+    if user_id != default_user_id and not allow_user_id:
+        return None, 'not allowed to file complaints for other users'
+    if not isinstance(user_id, int) or isinstance(user_id, bool):
+        return None, 'user_id must be an integer'
+
+    created_at = now
+    if row.get('created_at') is not None:
+        try:
+            created_at = datetime.fromisoformat(row['created_at'])
+        except (TypeError, ValueError):
+            return None, 'created_at must be an ISO 8601 date-time'
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone().replace(tzinfo=None)
+        if created_at > now:
+            return None, 'created_at is in the future'
+
+    return {
+        'department': department,
+        'pnr_no': pnr_no.strip(),
+        'age': age,
+        'additional_info': additional_info,
+        'user_id': user_id,
+        'created_at': created_at,
+    }, None
+
+
+def ingest(rows, default_user_id, allow_user_id=False, now=None):
+    """Validate, assign, score and insert a batch of complaints.
+
+    `rows` are (row number, object) pairs. Invalid rows are reported and
+    skipped; the valid ones are inserted with one executemany in a single
+    transaction, so either all of them land or none do.
+    """
+    now = now or datetime.now()
+    errors = []
+    numbers, valid = [], []
+    for number, row in rows:
+        clean, error = validate(row, default_user_id, allow_user_id, now)
+        if error:
+            errors.append({'row': number, 'error': error})
+        else:
+            numbers.append(number)
+            valid.append(clean)
+
+    # Owners must exist; one query for the whole batch
+    user_ids = {row['user_id'] for row in valid}
+    known = {user_id for (user_id,) in db.session.query(User.id).filter(User.id.in_(user_ids))} if user_ids else set()
+    kept = []
+    for number, row in zip(numbers, valid):
+        if row['user_id'] in known:
+            kept.append((number, row))
+        else:
+            errors.append({'row': number, 'error': f"unknown user_id {row['user_id']}"})
+    numbers = [number for number, row in kept]
+    valid = [row for number, row in kept]
+
+    report = {'received': len(rows), 'inserted': 0, 'complaints': [], 'errors': errors}
+    if not valid:
+        report['errors'].sort(key=lambda error: error['row'])
+        return report
+
+    urgencies = score_batch(
+        [row['department'] for row in valid],
+        [row['created_at'] for row in valid],
+        [row['age'] for row in valid],
+        [row['additional_info'] for row in valid],
+        now=now
+    )
+    # Least-loaded rule across the batch: each pick counts against the employee
+    picks = assignment_index.pick_many([row['department'] for row in valid])
+
+    params = [
+        {
+            'unique_id': unique_id,
+            'department': row['department'],
+            'date': row['created_at'].date(),
+            'time': row['created_at'].time(),
+            'pnr_no': row['pnr_no'],
+            'age': row['age'],
+            'additional_info': row['additional_info'],
+            'urgency': int(urgency),
+            'user_id': row['user_id'],
+            'assigned_employee_id': pick[0] if pick else None,
+        }
+        for row, urgency, pick, unique_id in zip(valid, urgencies, picks, complaint_ids.next_ids(len(valid)))
+    ]
+    try:
+        inserted = db.session.execute(
+            db.insert(Complaint).returning(Complaint.id, Complaint.unique_id, sort_by_parameter_order=True),
+            params
+        ).all()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for pick in picks:
+            if pick:
+                assignment_index.release(pick[0])
+        raise
+
+    report['inserted'] = len(inserted)
+    report['complaints'] = [
+        {'row': number, 'id': complaint_id, 'unique_id': unique_id,
+         'assigned_employee_id': param['assigned_employee_id'], 'urgency': param['urgency']}
+        for number, (complaint_id, unique_id), param in zip(numbers, inserted, params)
+    ]
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
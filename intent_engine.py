@@ -0,0 +1,120 @@
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+ENGINE_FILE = 'engine.joblib'
+
+
+class IntentEngine:
+    """Intent prediction from the trained CountVectorizer + LogisticRegression.
+
+    The vocabulary, the coefficient matrix and a tag -> responses dict are
+    taken out of the model once; scoring a message is then a sparse dot
+    product (sum of the coefficient rows of its tokens) plus the intercept,
+    without going through scikit-learn per call. An engine can be saved as a
+    versioned artifact whose arrays are memory-mapped on load, so forked
+    workers share one copy of the weights.
+    """
+
+    def __init__(self, vocabulary, classes, weights, intercept, responses, binary=False,
+                 token_pattern=None, vectorizer=None, version='legacy'):
+        self.vocabulary = vocabulary
+        self.classes = classes
+        self.weights = weights  # (vocabulary, classes)
+        self.intercept = intercept
+        self.responses = responses
+        self.binary = binary
+        self.token_pattern = token_pattern
+        self.vectorizer = vectorizer
+        self.version = version
+        if token_pattern is not None:
+            # Same tokens as the fitted analyzer, without its per-call dispatch
+            findall = re.compile(token_pattern).findall
+            self.analyzer = lambda message: findall(message.lower())
+        else:
+            self.analyzer = vectorizer.build_analyzer()
+
+    @classmethod
+    def from_model(cls, model, vectorizer, intents, version='legacy'):
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        intercept = np.asarray(model.intercept_, dtype=np.float64)
+        if coef.shape[0] == 1:
+            # Binary models keep one row scoring the second class against the first
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.0], intercept])
+
+        params = vectorizer.get_params()
+        plain = (
+            params['analyzer'] == 'word' and params['ngram_range'] == (1, 1) and params['lowercase']
+            and params['preprocessor'] is None and params['tokenizer'] is None
+            and params['stop_words'] is None and params['strip_accents'] is None
+        )
+        return cls(
+            vocabulary={str(token): int(index) for token, index in vectorizer.vocabulary_.items()},
+            classes=[str(tag) for tag in model.classes_],
+            weights=np.ascontiguousarray(coef.T),
+            intercept=intercept,
+            responses={intent["tag"]: intent["responses"] for intent in intents["intents"]},
+            binary=vectorizer.binary,
+            token_pattern=params['token_pattern'] if plain else None,
+            vectorizer=None if plain else vectorizer,
+            version=version,
+        )
+
+    def save(self, directory):
+        # Uncompressed so the arrays can be memory-mapped by load()
+        import joblib
+
+        joblib.dump({
+            'vocabulary': self.vocabulary,
+            'classes': self.classes,
+            'weights': self.weights,
+            'intercept': self.intercept,
+            'responses': self.responses,
+            'binary': self.binary,
+            'token_pattern': self.token_pattern,
+            'vectorizer': self.vectorizer,
+        }, os.path.join(directory, ENGINE_FILE))
+
+    @classmethod
+    def load(cls, directory, version, mmap_mode='r'):
+        import joblib
+
+        state = joblib.load(os.path.join(directory, ENGINE_FILE), mmap_mode=mmap_mode)
+        return cls(version=version, **state)
+
+    def normalize(self, message):
+        # The model only sees known tokens and their counts, so messages with
+        # the same sorted known tokens always get the same prediction
+        vocabulary = self.vocabulary
+        return tuple(sorted(token for token in self.analyzer(message) if token in vocabulary))
+
+    def features(self, message):
+        # (vocabulary indices, counts) of the known tokens
+        counts = Counter(self.vocabulary[token] for token in self.analyzer(message) if token in self.vocabulary)
+        if self.binary:
+            counts = dict.fromkeys(counts, 1)
+        return list(counts), list(counts.values())
+
+    def scores(self, features):
+        indices, counts = features
+        if not indices:
+            return self.intercept
+        return self.intercept + np.asarray(counts, dtype=np.float64) @ self.weights[indices]
+
+    def predict(self, message):
+        return self.classes[int(np.argmax(self.scores(self.features(message))))]
+
+    def predict_batch(self, messages):
+        rows, indices, counts = [], [], []
+        for row, message in enumerate(messages):
+            idx, cnt = self.features(message)
+            rows.extend([row] * len(idx))
+            indices.extend(idx)
+            counts.extend(cnt)
+        scores = np.tile(self.intercept, (len(messages), 1))
+        if indices:
+            np.add.at(scores, rows, self.weights[indices] * np.asarray(counts, dtype=np.float64)[:, None])
+        return [self.classes[i] for i in np.argmax(scores, axis=1)]
@@ -0,0 +1,88 @@
+"""Add stats rollup table
+
+Revision ID: 3f8a61c0e2b7
+Revises: 7c1e4b2d9a60
+Create Date: 2026-10-18 15:02:44.180233
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8a61c0e2b7'
+down_revision = '7c1e4b2d9a60'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of stats.rebuild(), so existing deployments open on filled-in
+# dashboards and this migration keeps working if stats.py changes
+COUNTERS = ('feedback_count', 'positive_count', 'neutral_count', 'negative_count',
+            'rating_sum', 'rating_count', 'solved_count')
+SENTIMENT_COUNTERS = {'Positive': 'positive_count', 'Neutral': 'neutral_count', 'Negative': 'negative_count'}
+
+
+def backfill(connection):
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    feedback_groups = connection.execute(sa.text(
+        'SELECT c.department, c.assigned_employee_id, date(f.created_at), f.sentiment,'
+        ' count(f.id), coalesce(sum(f.rating), 0), count(f.rating)'
+        ' FROM feedbacks f JOIN complaint c ON f.complaint_id = c.id'
+        ' WHERE f.sentiment IS NOT NULL'
+        ' GROUP BY c.department, c.assigned_employee_id, date(f.created_at), f.sentiment'
+    ))
+    for department, employee_id, day, sentiment, count, rating_sum, rating_count in feedback_groups:
+        keys = [('department', department, '')]
+        if employee_id:
+            keys.append(('employee', department, str(employee_id)))
+        if day:
+            keys.append(('day', department, str(day)))
+        for key in keys:
+            row = totals[key]
+            row['feedback_count'] += count
+            if sentiment in SENTIMENT_COUNTERS:
+                row[SENTIMENT_COUNTERS[sentiment]] += count
+            row['rating_sum'] += rating_sum
+            row['rating_count'] += rating_count
+
+    solved_groups = connection.execute(sa.text(
+        "SELECT department, assigned_employee_id, count(id) FROM complaint"
+        " WHERE status = 'Completed' GROUP BY department, assigned_employee_id"
+    ))
+    for department, employee_id, count in solved_groups:
+        totals[('department', department, '')]['solved_count'] += count
+        if employee_id:
+            totals[('employee', department, str(employee_id))]['solved_count'] += count
+
+    if totals:
+        rollup = sa.table('stats_rollup', sa.column('scope'), sa.column('department'), sa.column('key'),
+                          *(sa.column(name) for name in COUNTERS))
+        connection.execute(rollup.insert(), [
+            dict(scope=scope, department=department, key=key, **counters)
+            for (scope, department, key), counters in totals.items()
+        ])
+
+
+def upgrade():
+    op.create_table('stats_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(length=20), nullable=False),
+    sa.Column('department', sa.String(), nullable=False),
+    sa.Column('key', sa.String(length=32), nullable=False),
+    sa.Column('feedback_count', sa.Integer(), nullable=False),
+    sa.Column('positive_count', sa.Integer(), nullable=False),
+    sa.Column('neutral_count', sa.Integer(), nullable=False),
+    sa.Column('negative_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('solved_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope', 'department', 'key', name='uq_stats_rollup_scope_department_key')
+    )
+    backfill(op.get_bind())
+
+
+def downgrade():
+    op.drop_table('stats_rollup')
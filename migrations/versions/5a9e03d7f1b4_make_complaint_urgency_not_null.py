@@ -0,0 +1,35 @@
+"""Make complaint urgency not null
+
+Revision ID: 5a9e03d7f1b4
+Revises: e41b7c9d5a28
+Create Date: 2026-10-18 19:05:33.610274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9e03d7f1b4'
+down_revision = 'e41b7c9d5a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A NULL urgency drops out of the (urgency, id) keyset comparison
+    op.execute('UPDATE complaint SET urgency = 0 WHERE urgency IS NULL')
+
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.alter_column('urgency',
+               existing_type=sa.Integer(),
+               nullable=False,
+               server_default='0')
+
+
+def downgrade():
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.alter_column('urgency',
+               existing_type=sa.Integer(),
+               nullable=True,
+               server_default=None)
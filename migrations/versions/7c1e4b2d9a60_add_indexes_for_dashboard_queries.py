@@ -0,0 +1,48 @@
+"""Add indexes for dashboard queries
+
+Revision ID: 7c1e4b2d9a60
+Revises: bf3dca77cbbe
+Create Date: 2026-10-18 14:30:12.512380
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4b2d9a60'
+down_revision = 'bf3dca77cbbe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_role_department', ['role', 'department'], unique=False)
+
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.create_index('ix_complaint_department_urgency', ['department', 'urgency'], unique=False)
+        batch_op.create_index('ix_complaint_assignee_urgency', ['assigned_employee_id', 'urgency'], unique=False)
+        batch_op.create_index('ix_complaint_assignee_status', ['assigned_employee_id', 'status'], unique=False)
+        batch_op.create_index('ix_complaint_user_date', ['user_id', 'date', 'time'], unique=False)
+        batch_op.create_index('ix_complaint_status_date', ['status', 'date'], unique=False)
+
+    with op.batch_alter_table('feedbacks', schema=None) as batch_op:
+        batch_op.create_index('ix_feedbacks_complaint_id', ['complaint_id'], unique=False)
+        batch_op.create_index('ix_feedbacks_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('feedbacks', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedbacks_created_at')
+        batch_op.drop_index('ix_feedbacks_complaint_id')
+
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.drop_index('ix_complaint_status_date')
+        batch_op.drop_index('ix_complaint_user_date')
+        batch_op.drop_index('ix_complaint_assignee_status')
+        batch_op.drop_index('ix_complaint_assignee_urgency')
+        batch_op.drop_index('ix_complaint_department_urgency')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_role_department')
@@ -0,0 +1,42 @@
+"""Add complaint image table
+
+Revision ID: 8d2f6a41c3e9
+Revises: 3f8a61c0e2b7
+Create Date: 2026-10-18 16:21:07.502318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f6a41c3e9'
+down_revision = '3f8a61c0e2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('complaint_image',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('complaint_id', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['complaint_id'], ['complaint.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('complaint_image', schema=None) as batch_op:
+        batch_op.create_index('ix_complaint_image_complaint_id', ['complaint_id'], unique=False)
+        batch_op.create_index('ix_complaint_image_digest', ['digest'], unique=False)
+    # Move existing files from complaint.images with `flask import-uploads`
+
+
+def downgrade():
+    with op.batch_alter_table('complaint_image', schema=None) as batch_op:
+        batch_op.drop_index('ix_complaint_image_digest')
+        batch_op.drop_index('ix_complaint_image_complaint_id')
+
+    op.drop_table('complaint_image')
@@ -0,0 +1,29 @@
+"""Add id worker lease table
+
+Revision ID: c7f25e8a0d13
+Revises: 5a9e03d7f1b4
+Create Date: 2026-10-18 21:12:47.381920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f25e8a0d13'
+down_revision = '5a9e03d7f1b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('id_worker_lease',
+    sa.Column('worker_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner', sa.String(length=128), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('worker_id')
+    )
+
+
+def downgrade():
+    op.drop_table('id_worker_lease')
@@ -0,0 +1,82 @@
+"""Time-ordered complaint ids
+
+Revision ID: e41b7c9d5a28
+Revises: 8d2f6a41c3e9
+Create Date: 2026-10-18 17:40:12.915604
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b7c9d5a28'
+down_revision = '8d2f6a41c3e9'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of idgen's encoding (ms << 22 | worker << 12 | sequence, 13
+# Crockford base32 chars), so this migration keeps working if idgen changes.
+# Converted rows use worker 0 and keep their original time order.
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+
+def encode(value):
+    chars = []
+    for _ in range(13):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def legacy_ms(unique_id, date, time):
+    try:
+        return int(float(unique_id) * 1000)
+    except ValueError:
+        return int(datetime.fromisoformat(f'{date}T{time}').timestamp() * 1000)
+
+
+def upgrade():
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('legacy_unique_id', sa.String(), nullable=True))
+        batch_op.create_unique_constraint('uq_complaint_legacy_unique_id', ['legacy_unique_id'])
+
+    connection = op.get_bind()
+    complaint = sa.table(
+        'complaint',
+        sa.column('id', sa.Integer), sa.column('unique_id', sa.String), sa.column('legacy_unique_id', sa.String)
+    )
+    rows = connection.execute(sa.text(
+        'SELECT id, unique_id, date, time FROM complaint ORDER BY date, time, id'
+    )).fetchall()
+
+    updates = []
+    last_ms, sequence = -1, 0
+    for complaint_id, unique_id, date, time in rows:
+        ms = legacy_ms(unique_id, date, time)
+        if ms <= last_ms:
+            ms, sequence = last_ms, sequence + 1
+            if sequence > 4095:
+                ms, sequence = ms + 1, 0
+        else:
+            sequence = 0
+        last_ms = ms
+        updates.append({'row_id': complaint_id, 'new_id': encode(ms << 22 | sequence), 'old_id': unique_id})
+
+    if updates:
+        connection.execute(
+            complaint.update()
+            .where(complaint.c.id == sa.bindparam('row_id'))
+            .values(unique_id=sa.bindparam('new_id'), legacy_unique_id=sa.bindparam('old_id')),
+            updates
+        )
+
+
+def downgrade():
+    op.execute('UPDATE complaint SET unique_id = legacy_unique_id WHERE legacy_unique_id IS NOT NULL')
+
+    with op.batch_alter_table('complaint', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_complaint_legacy_unique_id', type_='unique')
+        batch_op.drop_column('legacy_unique_id')
@@ -1,33 +1,161 @@
+import argparse
+import hashlib
 import json
+import os
 import pickle
-import numpy as np
-import nltk
+import time
+from datetime import datetime
 
-from nltk.stem import WordNetLemmatizer
+import joblib
+import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import StratifiedKFold
+
+from chatbot_engine import ARTIFACTS_DIR, publish_engine
+from intent_engine import IntentEngine
+
+FEATURE_CACHE = os.path.join(ARTIFACTS_DIR, "features")
+TRAINING_LOG = os.path.join(ARTIFACTS_DIR, "training_runs.jsonl")
+
+
+def load_dataset(path):
+    with open(path, "rb") as file:
+        raw = file.read()
+    data = json.loads(raw)
+
+    sentences = []
+    labels = []
+    for intent in data["intents"]:
+        for pattern in intent["patterns"]:
+            sentences.append(pattern)
+            labels.append(intent["tag"])
+    return data, sentences, labels, hashlib.sha256(raw).hexdigest()
+
+
+def vectorize(sentences, digest, use_cache=True):
+    # Features depend only on the data and the vectorizer settings, so a
+    # rerun on unchanged data (e.g. trying another model) skips this step
+    vectorizer = CountVectorizer()
+    key = hashlib.sha256((digest + repr(sorted(vectorizer.get_params().items()))).encode()).hexdigest()[:16]
+    path = os.path.join(FEATURE_CACHE, f"{key}.joblib")
+    if use_cache and os.path.exists(path):
+        X, vectorizer = joblib.load(path)
+        return X, vectorizer, True
+
+    X = vectorizer.fit_transform(sentences)
+    if use_cache:
+        os.makedirs(FEATURE_CACHE, exist_ok=True)
+        joblib.dump((X, vectorizer), path + ".tmp")
+        os.replace(path + ".tmp", path)
+    return X, vectorizer, False
+
+
+def build_model(kind):
+    if kind == "sgd":
+        # Logistic loss keeps predict() an argmax over linear scores, like LogisticRegression
+        return SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)
+    return LogisticRegression(max_iter=1000)
+
+
+def fit(model, X, y, epochs, batch_size):
+    if not isinstance(model, SGDClassifier):
+        return model.fit(X, y)
+    # Streams minibatches through partial_fit, so memory does not grow with the corpus
+    classes = np.unique(y)
+    rng = np.random.default_rng(0)
+    for _ in range(epochs):
+        order = rng.permutation(X.shape[0])
+        for start in range(0, X.shape[0], batch_size):
+            rows = order[start:start + batch_size]
+            model.partial_fit(X[rows], y[rows], classes=classes)
+    return model
+
+
+def score_fold(kind, X, y, train, test, epochs, batch_size):
+    model = fit(build_model(kind), X[train], y[train], epochs, batch_size)
+    return float((model.predict(X[test]) == y[test]).mean())
+
+
+def cross_validate(kind, X, y, folds, jobs, epochs, batch_size):
+    # Folds run in parallel worker processes (joblib) and train exactly like the
+    # published model, minibatches included; skipped if a tag has too few patterns
+    folds = min(folds, int(np.unique(y, return_counts=True)[1].min()))
+    if folds < 2:
+        return None
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    scores = joblib.Parallel(n_jobs=jobs)(
+        joblib.delayed(score_fold)(kind, X, y, train, test, epochs, batch_size)
+        for train, test in splitter.split(X, y)
+    )
+    return np.asarray(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the chatbot intent classifier.")
+    parser.add_argument("--data", default="intents.json")
+    parser.add_argument("--model", choices=("logreg", "sgd"), default="logreg",
+                        help="sgd trains incrementally with partial_fit in minibatches.")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel cross-validation workers.")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute features even if cached.")
+    parser.add_argument("--no-publish", action="store_true", help="Only evaluate, do not publish a version.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data, sentences, labels, digest = load_dataset(args.data)
+    X, vectorizer, cached = vectorize(sentences, digest, use_cache=not args.no_cache)
+    y = np.asarray(labels)
+    vectorize_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = cross_validate(args.model, X, y, args.folds, args.jobs, args.epochs, args.batch_size)
+    cv_seconds = time.perf_counter() - start
 
-lemmatizer = WordNetLemmatizer()
+    start = time.perf_counter()
+    model = fit(build_model(args.model), X, y, args.epochs, args.batch_size)
+    train_seconds = time.perf_counter() - start
+    train_accuracy = float((model.predict(X) == y).mean())
 
-with open("intents.json") as file:
-    data = json.load(file)
+    run = {
+        "finished_at": datetime.utcnow().isoformat(),
+        "data_sha256": digest,
+        "model": args.model,
+        "patterns": len(sentences),
+        "intents": len(data["intents"]),
+        "features_cached": cached,
+        "vectorize_seconds": round(vectorize_seconds, 3),
+        "cv_folds": len(scores) if scores is not None else 0,
+        "cv_accuracy": round(float(scores.mean()), 4) if scores is not None else None,
+        "cv_accuracy_std": round(float(scores.std()), 4) if scores is not None else None,
+        "cv_seconds": round(cv_seconds, 3),
+        "train_seconds": round(train_seconds, 3),
+        "train_accuracy": round(train_accuracy, 4),
+    }
 
-sentences = []
-labels = []
+    if not args.no_publish:
+        pickle.dump(model, open("model.pkl","wb"))
+        pickle.dump(vectorizer, open("vectorizer.pkl","wb"))
+        pickle.dump(data, open("intents.pkl","wb"))
 
-for intent in data["intents"]:
-    for pattern in intent["patterns"]:
-        sentences.append(pattern)
-        labels.append(intent["tag"])
+        # Publish a memory-mappable version; running workers pick it up without a restart
+        run["version"] = publish_engine(IntentEngine.from_model(model, vectorizer, data), run)
 
-vectorizer = CountVectorizer()
-X = vectorizer.fit_transform(sentences)
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(TRAINING_LOG, "a") as log:
+        log.write(json.dumps(run) + "\n")
 
-model = LogisticRegression()
-model.fit(X, labels)
+    print(f"{run['patterns']} patterns, {run['intents']} intents, model={args.model}"
+          f" (features {'from cache' if cached else 'computed'} in {run['vectorize_seconds']}s)")
+    if scores is not None:
+        print(f"cross-validation: {run['cv_accuracy']:.3f} ± {run['cv_accuracy_std']:.3f} accuracy"
+              f" over {run['cv_folds']} folds in {run['cv_seconds']}s")
+    print(f"training: {run['train_seconds']}s, training-set accuracy {run['train_accuracy']:.3f}")
+    if "version" in run:
+        print(f"Model trained successfully, published version {run['version']}")
 
-pickle.dump(model, open("model.pkl","wb"))
-pickle.dump(vectorizer, open("vectorizer.pkl","wb"))
-pickle.dump(data, open("intents.pkl","wb"))
 
-print("Model trained successfully")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,10 @@ db = SQLAlchemy()
 # ================= USER MODEL =================
 class User(db.Model, UserMixin):
     __tablename__ = 'user'
+    __table_args__ = (
+        # Employee lookups by department (assignment, view_employees)
+        db.Index('ix_user_role_department', 'role', 'department'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -37,10 +41,25 @@ class User(db.Model, UserMixin):
 # ================= COMPLAINT MODEL =================
 class Complaint(db.Model):
     __tablename__ = 'complaint'
+    __table_args__ = (
+        # Admin dashboard: one department, most urgent first
+        db.Index('ix_complaint_department_urgency', 'department', 'urgency'),
+        # Employee dashboard: assigned complaints, most urgent first
+        db.Index('ix_complaint_assignee_urgency', 'assigned_employee_id', 'urgency'),
+        # Open complaint counts per employee
+        db.Index('ix_complaint_assignee_status', 'assigned_employee_id', 'status'),
+        # User dashboard and tracking: a passenger's complaints, newest first
+        db.Index('ix_complaint_user_date', 'user_id', 'date', 'time'),
+        # Urgency rescoring: Unsolved complaints by age
+        db.Index('ix_complaint_status_date', 'status', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
+    # Tracking number from idgen; time-ordered, so new rows append to the unique index
     unique_id = db.Column(db.String, unique=True, nullable=False)
+    # The timestamp-style tracking number of complaints filed before idgen
+    legacy_unique_id = db.Column(db.String, unique=True, nullable=True)
 
     department = db.Column(db.String, nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -53,7 +72,8 @@ class Complaint(db.Model):
     images = db.Column(db.String, nullable=True)
 
     status = db.Column(db.String(20), default='Unsolved')
-    urgency = db.Column(db.Integer, default=0)
+    # NOT NULL: the dashboards keyset-paginate on (urgency, id)
+    urgency = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Foreign Keys
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -79,10 +99,22 @@ class Complaint(db.Model):
         lazy=True
     )
 
+    image_files = db.relationship(
+        'ComplaintImage',
+        back_populates='complaint',
+        cascade="all, delete-orphan",
+        order_by='ComplaintImage.position',
+        lazy=True
+    )
+
 
 # ================= FEEDBACK MODEL =================
 class Feedback(db.Model):
     __tablename__ = 'feedbacks'
+    __table_args__ = (
+        db.Index('ix_feedbacks_complaint_id', 'complaint_id'),
+        db.Index('ix_feedbacks_created_at', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -104,3 +136,62 @@ class Feedback(db.Model):
         self.feedback_text = feedback_text
         self.sentiment = sentiment
         self.rating = rating
+
+
+# ================= COMPLAINT IMAGE MODEL =================
+class ComplaintImage(db.Model):
+    __tablename__ = 'complaint_image'
+    __table_args__ = (
+        db.Index('ix_complaint_image_complaint_id', 'complaint_id'),
+        # Which complaints reference a stored blob
+        db.Index('ix_complaint_image_digest', 'digest'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    complaint_id = db.Column(db.Integer, db.ForeignKey('complaint.id'), nullable=False)
+
+    # SHA-256 of the content; the file lives in the UploadStore under this name
+    digest = db.Column(db.String(64), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)   # original (sanitized) name, for display
+    content_type = db.Column(db.String(100), nullable=True)
+    size = db.Column(db.Integer, nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+
+    # Relationship
+    complaint = relationship('Complaint', back_populates='image_files')
+
+
+# ================= STATS ROLLUP MODEL =================
+class StatsRollup(db.Model):
+    __tablename__ = 'stats_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'department', 'key', name='uq_stats_rollup_scope_department_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # 'department' (key ''), 'employee' (key = employee id) or 'day' (key = ISO date)
+    scope = db.Column(db.String(20), nullable=False)
+    department = db.Column(db.String, nullable=False)
+    key = db.Column(db.String(32), nullable=False, default='')
+
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, nullable=False, default=0)
+    neutral_count = db.Column(db.Integer, nullable=False, default=0)
+    negative_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    solved_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# ================= ID WORKER LEASE MODEL =================
+class IdWorkerLease(db.Model):
+    __tablename__ = 'id_worker_lease'
+
+    # idgen worker id (0-1023); one row per id that has ever been leased
+    worker_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # host:pid:nonce of the process holding it
+    owner = db.Column(db.String(128), nullable=False)
+    # UTC; once past, any process may take the id over
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,61 @@
+import base64
+import json
+
+from sqlalchemy import tuple_
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    values = [v.isoformat() if hasattr(v, 'isoformat') else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    # Raises ValueError for anything that isn't a cursor we handed out
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(raw, list) or len(raw) != len(columns):
+        raise ValueError('Invalid cursor')
+
+    values = []
+    for column, value in zip(columns, raw):
+        python_type = column.type.python_type
+        # Keyset columns are NOT NULL; a null or wrongly typed value is a forged cursor
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError('Invalid cursor')
+        if python_type is int and not (isinstance(value, int) and -2**63 <= value < 2**63):
+            raise ValueError('Invalid cursor')  # SQLite integers are 64-bit
+        try:
+            if hasattr(python_type, 'fromisoformat'):
+                values.append(python_type.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        except (TypeError, ValueError, OverflowError) as exc:
+            raise ValueError('Invalid cursor') from exc
+    return values
+
+
+def keyset_paginate(query, columns, cursor=None, per_page=50):
+    # Walks `query` newest/highest first on `columns` (all NOT NULL, the last
+    # one unique, e.g. the primary key). Each page starts strictly after the
+    # last row of the previous one, so deep pages cost the same as the first.
+    if cursor:
+        query = query.filter(tuple_(*columns) < tuple_(*decode_cursor(cursor, columns)))
+    rows = query.order_by(*[column.desc() for column in columns]).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return KeysetPage(rows, next_cursor)
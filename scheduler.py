@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs `fn(last_run, now)` every `interval` seconds on a daemon thread.
+
+    `last_run` is the start time of the previous successful run (None the
+    first time), so jobs can limit themselves to what changed in between.
+    Each run happens inside an application context and its timings are kept
+    for the admin status endpoint.
+    """
+
+    def __init__(self, name, fn, interval, app=None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.app = app
+        self.last_run = None
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = None
+        self.total_duration = 0.0
+        self.last_result = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        # Serialized so a manual trigger never overlaps the timer thread
+        with self._lock:
+            now = datetime.now()
+            start = time.perf_counter()
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        result = self.fn(self.last_run, now)
+                else:
+                    result = self.fn(self.last_run, now)
+            except Exception as exc:
+                self.failures += 1
+                self.last_error = f'{type(exc).__name__}: {exc}'
+                logger.exception('Periodic task %s failed', self.name)
+                result = None
+            else:
+                self.last_run = now
+                self.last_result = result
+                self.last_error = None
+            finally:
+                duration = time.perf_counter() - start
+                self.runs += 1
+                self.last_duration = duration
+                self.total_duration += duration
+            return result
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        # Safe to call on every request: only the first call in a process
+        # (or after a fork, which leaves the thread behind) starts it
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_duration': self.last_duration,
+            'avg_duration': self.total_duration / self.runs if self.runs else None,
+            'last_result': self.last_result,
+            'last_error': self.last_error,
+        }
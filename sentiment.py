@@ -0,0 +1,221 @@
+import importlib.util
+import os
+import re
+import threading
+from xml.etree import ElementTree
+
+# Drop-in replacement for TextBlob(text).sentiment.polarity: the same lexicon
+# (TextBlob's en-sentiment.xml) and the same pattern-analyzer rules for
+# negation, modifiers, "!" and emoticons, without building a TextBlob, running
+# its sentence splitter or importing NLTK.
+
+NEGATIONS = frozenset(('no', 'not', "n't", 'never'))
+
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+_LEADING = tuple(PUNCTUATION.replace('.', ''))
+_TRAILING = _LEADING + ('.',)
+
+ABBREVIATIONS = frozenset((
+    'a.', 'adj.', 'adv.', 'al.', 'a.m.', 'c.', 'cf.', 'comp.', 'conf.', 'def.', 'ed.', 'e.g.', 'esp.',
+    'etc.', 'ex.', 'f.', 'fig.', 'gen.', 'id.', 'i.e.', 'int.', 'l.', 'm.', 'Med.', 'Mil.', 'Mr.', 'n.',
+    'n.q.', 'orig.', 'pl.', 'pred.', 'pres.', 'p.m.', 'ref.', 'v.', 'vs.', 'w/',
+))
+RE_ABBR = re.compile(r'^(?:[A-Za-z]\.|(?:[A-Za-z]\.)+|[A-Z][bcdfghjklmnpqrstvwxz|]+.)$')
+
+# (sentiment, emoticons) in the analyzer's lookup order
+EMOTICONS = (
+    (+1.00, ('<3', '♥')),
+    (+1.00, ('>:D', ':-D', ':D', '=-D', '=D', 'X-D', 'x-D', 'XD', 'xD', '8-D')),
+    (+0.75, ('>:P', ':-P', ':P', ':-p', ':p', ':-b', ':b', ':c)', ':o)', ':^)')),
+    (+0.50, ('>:)', ':-)', ':)', '=)', '=]', ':]', ':}', ':>', ':3', '8)', '8-)')),
+    (+0.25, ('>;]', ';-)', ';)', ';-]', ';]', ';D', ';^)', '*-)', '*)')),
+    (+0.05, ('>:o', ':-O', ':O', ':o', ':-o', 'o_O', 'o.O', '°O°', '°o°')),
+    (-0.25, ('>:/', ':-/', ':/', ':\\', '>:\\', ':-.', ':-s', ':s', ':S', ':-S', '>.>')),
+    (-0.75, ('>:[', ':-(', ':(', '=(', ':-[', ':[', ':{', ':-<', ':c', ':-c', '=/')),
+    (-1.00, (":'(", ":'''(", ";'(")),
+)
+EMOTICON_POLARITY = {}
+for _polarity, _faces in EMOTICONS:
+    for _face in _faces:
+        EMOTICON_POLARITY.setdefault(_face.lower(), _polarity)
+
+RE_CONTRACTION = re.compile(r"'d|'m|'s|'ll|'re|'ve|n't")
+RE_QUOTES = re.compile('([“”‘’\'"])')
+RE_PARAGRAPH = re.compile(r'\n{2,}')
+RE_SARCASM = re.compile(r'\( ?\! ?\)')
+RE_EMOTICONS = re.compile(r'(%s)($|\s)' % '|'.join(
+    r' ?'.join(re.escape(c) for c in face) for _, faces in EMOTICONS for face in faces
+))
+
+
+def lexicon_path():
+    # Located without importing textblob, which would pull in NLTK
+    spec = importlib.util.find_spec('textblob')
+    return os.path.join(spec.submodule_search_locations[0], 'en', 'en-sentiment.xml')
+
+
+def _avg(values):
+    return sum(values) / float(len(values) or 1)
+
+
+def load_lexicon(path=None):
+    # {word: (polarity, subjectivity, intensity, is_modifier)}, averaged over
+    # senses and parts of speech exactly as the pattern analyzer does
+    words = {}
+    for node in ElementTree.parse(path or lexicon_path()).getroot().findall('word'):
+        form = node.attrib.get('form')
+        if form:
+            psi = (float(node.attrib.get('polarity', 0.0)), float(node.attrib.get('subjectivity', 0.0)),
+                   float(node.attrib.get('intensity', 1.0)))
+            words.setdefault(form, {}).setdefault(node.attrib.get('pos'), []).append(psi)
+    for form, senses in words.items():
+        by_pos = {pos: [_avg(each) for each in zip(*psi)] for pos, psi in senses.items()}
+        by_pos[None] = [_avg(each) for each in zip(*by_pos.values())]
+        words[form] = by_pos
+
+    # Adjectives also score as their -ly adverb ("terrible" -> "terribly")
+    for form, by_pos in list(words.items()):
+        if 'JJ' in by_pos:
+            if form.endswith('y'):
+                form = form[:-1] + 'i'
+            if form.endswith('le'):
+                form = form[:-2]
+            adverb = words.setdefault(form + 'ly', {})
+            adverb['RB'] = adverb[None] = by_pos['JJ']
+
+    return {form: (*by_pos[None], 'RB' in by_pos) for form, by_pos in words.items()}
+
+
+def tokenize(text):
+    # Lowercased word stream of the pattern tokenizer (punctuation split off,
+    # contractions and quotes separated, "( ! )" and spaced emoticons rejoined)
+    text = RE_CONTRACTION.sub(r' \g<0>', str(text))
+    text = RE_QUOTES.sub(r' \1 ', text)
+    text = RE_PARAGRAPH.sub(' ', text.replace('\r\n', '\n'))
+
+    tokens = []
+    append = tokens.append
+    for t in text.split():
+        tail = []
+        while t.startswith(_LEADING):
+            append(t[0])
+            t = t[1:]
+        while t.endswith(_TRAILING):
+            if t.endswith(_LEADING):
+                tail.append(t[-1])
+                t = t[:-1]
+            if t.endswith('...'):
+                tail.append('...')
+                t = t[:-3].rstrip('.')
+            if t.endswith('.'):
+                if t in ABBREVIATIONS or RE_ABBR.match(t):
+                    break
+                tail.append('.')
+                t = t[:-1]
+        if t:
+            append(t)
+        tokens.extend(reversed(tail))
+
+    text = RE_SARCASM.sub('(!)', ' '.join(tokens))
+    text = RE_EMOTICONS.sub(lambda m: m.group(1).replace(' ', '') + m.group(2), text)
+    return text.lower().split()
+
+
+class SentimentAnalyzer:
+    def __init__(self, path=None):
+        self.path = path
+        self._lexicon = None
+        self._lock = threading.Lock()
+
+    @property
+    def lexicon(self):
+        if self._lexicon is None:
+            with self._lock:
+                if self._lexicon is None:
+                    self._lexicon = load_lexicon(self.path)
+        return self._lexicon
+
+    def assessments(self, words):
+        # [[polarity, subjectivity, intensity, negated]] per scored chunk
+        lexicon = self.lexicon
+        a = []
+        m = None  # preceding modifier ("very good")
+        n = None  # preceding negation ("not good")
+        for w in words:
+            entry = lexicon.get(w)
+            if entry is not None:
+                p, s, i, is_modifier = entry
+                if m is None:
+                    a.append([p, s, i, False])
+                else:
+                    last = a[-1]
+                    last[0] = max(-1.0, min(p * last[2], +1.0))
+                    last[1] = max(-1.0, min(s * last[2], +1.0))
+                    last[2] = i
+                if n is not None:
+                    a[-1][2] = 1.0 / a[-1][2]
+                    a[-1][3] = True
+                m = w if is_modifier else None
+                n = w if w in NEGATIONS else None
+            else:
+                if w in NEGATIONS:
+                    n = w
+                elif n and len(w.strip("'")) > 1:
+                    n = None
+                if n is not None and m is not None and m.endswith('ly'):
+                    a[-1][3] = True
+                    n = None
+                elif m and len(w) > 2:
+                    m = None
+                if w == '!' and a:
+                    a[-1][0] = max(-1.0, min(a[-1][0] * 1.25, +1.0))
+                if w == '(!)':
+                    a.append([0.0, 1.0, 1.0, False])
+                if not w.isalpha() and len(w) <= 5 and w not in PUNCTUATION:
+                    polarity = EMOTICON_POLARITY.get(w)
+                    if polarity is not None:
+                        a.append([polarity, 1.0, 1.0, False])
+        return a
+
+    def polarity(self, text):
+        a = self.assessments(tokenize(text))
+        # "not good" = slightly bad, "not bad" = slightly good
+        total = 0
+        for p, s, i, negated in a:
+            total += p * -0.5 if negated else p
+        return total / float(len(a) or 1)
+
+    def subjectivity(self, text):
+        a = self.assessments(tokenize(text))
+        return sum(s for p, s, i, negated in a) / float(len(a) or 1)
+
+    def label(self, text):
+        return polarity_label(self.polarity(text))
+
+    def label_batch(self, texts):
+        # Repeated texts (common for short feedback) are scored once
+        seen = {}
+        labels = []
+        for text in texts:
+            label = seen.get(text)
+            if label is None:
+                label = seen[text] = self.label(text)
+            labels.append(label)
+        return labels
+
+
+def polarity_label(polarity):
+    if polarity > 0:
+        return "Positive"
+    elif polarity < 0:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
+analyzer = SentimentAnalyzer()
+
+
+def label_texts(texts):
+    # Module-level so process pool workers can run it after importing only this module
+    return analyzer.label_batch(texts)
@@ -0,0 +1,122 @@
+from collections import defaultdict
+
+from sqlalchemy import insert
+
+from models import db, Complaint, Feedback, StatsRollup
+
+COUNTERS = ('feedback_count', 'positive_count', 'neutral_count', 'negative_count',
+            'rating_sum', 'rating_count', 'solved_count')
+
+SENTIMENT_COUNTERS = {'Positive': 'positive_count', 'Neutral': 'neutral_count', 'Negative': 'negative_count'}
+
+
+def _insert():
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(StatsRollup)
+
+
+def _bump(scope, department, key, **increments):
+    # Atomic "insert or add to" so concurrent requests never lose an update
+    values = dict.fromkeys(COUNTERS, 0)
+    values.update(increments)
+    statement = _insert().values(scope=scope, department=department, key=key, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=['scope', 'department', 'key'],
+        set_={name: getattr(StatsRollup, name) + getattr(statement.excluded, name) for name in increments}
+    )
+    db.session.execute(statement)
+
+
+def _feedback_increments(sentiment, rating):
+    increments = {'feedback_count': 1}
+    if sentiment in SENTIMENT_COUNTERS:
+        increments[SENTIMENT_COUNTERS[sentiment]] = 1
+    if rating is not None:
+        increments['rating_sum'] = rating
+        increments['rating_count'] = 1
+    return increments
+
+
+def record_feedback(complaint, feedback):
+    # Call before committing the feedback so both land in one transaction
+    increments = _feedback_increments(feedback.sentiment, feedback.rating)
+    _bump('department', complaint.department, '', **increments)
+    if complaint.assigned_employee_id:
+        _bump('employee', complaint.department, str(complaint.assigned_employee_id), **increments)
+    _bump('day', complaint.department, feedback.created_at.date().isoformat(), **increments)
+
+
+def record_solved(complaint):
+    _bump('department', complaint.department, '', solved_count=1)
+    if complaint.assigned_employee_id:
+        _bump('employee', complaint.department, str(complaint.assigned_employee_id), solved_count=1)
+
+
+def department_summary(department):
+    row = StatsRollup.query.filter_by(scope='department', department=department, key='').first()
+    return row or StatsRollup(scope='department', department=department, key='', **dict.fromkeys(COUNTERS, 0))
+
+
+def daily_rows(department):
+    return StatsRollup.query.filter_by(scope='day', department=department).order_by(StatsRollup.key).all()
+
+
+def employee_rows(department):
+    return StatsRollup.query.filter_by(scope='employee', department=department).all()
+
+
+def sentiment_counts(row):
+    return {sentiment: getattr(row, counter) for sentiment, counter in SENTIMENT_COUNTERS.items()}
+
+
+def rebuild():
+    # Recompute every rollup row from the full history (backfill / repair)
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    feedback_day = db.func.date(Feedback.created_at)
+    feedback_groups = (
+        db.session.query(
+            Complaint.department, Complaint.assigned_employee_id, feedback_day, Feedback.sentiment,
+            db.func.count(Feedback.id), db.func.coalesce(db.func.sum(Feedback.rating), 0), db.func.count(Feedback.rating)
+        )
+        .join(Complaint, Feedback.complaint_id == Complaint.id)
+        # Unscored feedback is counted by the score_feedback job, which calls record_feedback
+        .filter(Feedback.sentiment.isnot(None))
+        .group_by(Complaint.department, Complaint.assigned_employee_id, feedback_day, Feedback.sentiment)
+    )
+    for department, employee_id, day, sentiment, count, rating_sum, rating_count in feedback_groups:
+        keys = [('department', department, '')]
+        if employee_id:
+            keys.append(('employee', department, str(employee_id)))
+        if day:
+            keys.append(('day', department, str(day)))
+        for key in keys:
+            row = totals[key]
+            row['feedback_count'] += count
+            if sentiment in SENTIMENT_COUNTERS:
+                row[SENTIMENT_COUNTERS[sentiment]] += count
+            row['rating_sum'] += rating_sum
+            row['rating_count'] += rating_count
+
+    solved_groups = (
+        db.session.query(Complaint.department, Complaint.assigned_employee_id, db.func.count(Complaint.id))
+        .filter(Complaint.status == 'Completed')
+        .group_by(Complaint.department, Complaint.assigned_employee_id)
+    )
+    for department, employee_id, count in solved_groups:
+        totals[('department', department, '')]['solved_count'] += count
+        if employee_id:
+            totals[('employee', department, str(employee_id))]['solved_count'] += count
+
+    StatsRollup.query.delete()
+    if totals:
+        db.session.execute(
+            insert(StatsRollup),
+            [dict(scope=scope, department=department, key=key, **counters)
+             for (scope, department, key), counters in totals.items()]
+        )
+    db.session.commit()
+    return len(totals)
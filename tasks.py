@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_at REAL NOT NULL,
+    locked_until REAL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status_run_at ON jobs (status, run_at);
+"""
+
+STATUSES = ('queued', 'running', 'done', 'failed')
+
+
+class TaskQueue:
+    """Durable job queue in its own SQLite file, drained by worker threads.
+
+    A claimed job holds a lease; if the process dies mid-job the lease runs
+    out and the job is picked up again, so work survives restarts. Failed
+    jobs are retried with exponential backoff up to `max_attempts`. Handlers
+    run as `fn(**payload)` inside an application context and must be
+    idempotent, since a job can run again after a crash.
+    """
+
+    def __init__(self, path, app=None, workers=2, max_attempts=5, backoff=2.0, lease=600, name='task-queue'):
+        self.path = path
+        self.app = app
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.name = name
+        self.handlers = {}
+        self.processed = 0
+        self.failures = 0
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._counter_lock = threading.Lock()
+
+    def handler(self, name):
+        def register(fn):
+            self.handlers[name] = fn
+            return fn
+        return register
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, name, delay=0, **payload):
+        if name not in self.handlers:
+            raise KeyError(f'No handler registered for {name!r}')
+        now = time.time()
+        cursor = self._connection().execute(
+            'INSERT INTO jobs (name, payload, run_at, created_at) VALUES (?, ?, ?, ?)',
+            (name, json.dumps(payload), now + delay, now)
+        )
+        self._wake.set()
+        return cursor.lastrowid
+
+    def claim(self):
+        # Next due job, or a running one whose lease expired (its worker died)
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = 'queued' AND run_at <= ?) "
+                    "OR (status = 'running' AND locked_until < ?) ORDER BY run_at, id LIMIT 1",
+                    (now, now)
+                ).fetchone()
+                if row is not None and row['status'] == 'running' and row['attempts'] >= self.max_attempts:
+                    # Crashed its worker on every attempt; stop handing it out
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', locked_until = NULL, finished_at = ?, "
+                        "last_error = 'Lease expired' WHERE id = ?",
+                        (now, row['id'])
+                    )
+                    continue
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_until = ? WHERE id = ?",
+                        (now + self.lease, row['id'])
+                    )
+                break
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def run_job(self, row):
+        conn = self._connection()
+        attempts = row['attempts'] + 1
+        try:
+            fn = self.handlers[row['name']]
+            payload = json.loads(row['payload'])
+            if self.app is not None:
+                with self.app.app_context():
+                    fn(**payload)
+            else:
+                fn(**payload)
+        except Exception as exc:
+            error = f'{type(exc).__name__}: {exc}'
+            logger.exception('Job %s (%s) failed on attempt %d', row['id'], row['name'], attempts)
+            if attempts >= self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', locked_until = NULL, finished_at = ?, last_error = ? WHERE id = ?",
+                    (time.time(), error, row['id'])
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', locked_until = NULL, run_at = ?, last_error = ? WHERE id = ?",
+                    (time.time() + self.backoff ** attempts, error, row['id'])
+                )
+            with self._counter_lock:
+                self.failures += 1
+            return False
+
+        conn.execute(
+            "UPDATE jobs SET status = 'done', locked_until = NULL, finished_at = ? WHERE id = ?",
+            (time.time(), row['id'])
+        )
+        with self._counter_lock:
+            self.processed += 1
+        return True
+
+    def run_pending(self):
+        # Drain everything that is due; returns the number of jobs run
+        count = 0
+        while True:
+            row = self.claim()
+            if row is None:
+                return count
+            self.run_job(row)
+            count += 1
+
+    def _next_due_in(self):
+        row = self._connection().execute("SELECT MIN(run_at) FROM jobs WHERE status = 'queued'").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_pending():
+                    continue
+                wait = self._next_due_in()
+            except Exception:
+                logger.exception('Task queue worker error')
+                wait = None
+            self._wake.wait(min(wait, 5.0) if wait is not None else 5.0)
+            self._wake.clear()
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        for i in range(len(self._threads), self.workers):
+            thread = threading.Thread(target=self._loop, name=f'{self.name}-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def counts(self):
+        rows = self._connection().execute('SELECT name, status, COUNT(*) FROM jobs GROUP BY name, status')
+        counts = {}
+        for name, status, count in rows:
+            counts.setdefault(name, dict.fromkeys(STATUSES, 0))[status] = count
+        return counts
+
+    def jobs(self, status=None, limit=20):
+        query = 'SELECT * FROM jobs'
+        params = []
+        if status:
+            query += ' WHERE status = ?'
+            params.append(status)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in self._connection().execute(query, params)]
+
+    def payloads(self, name, statuses=('queued', 'running', 'failed')):
+        # Payloads of the jobs called `name` that are not done yet
+        marks = ', '.join('?' * len(statuses))
+        rows = self._connection().execute(
+            f'SELECT payload FROM jobs WHERE name = ? AND status IN ({marks})', (name, *statuses)
+        )
+        return [json.loads(payload) for (payload,) in rows]
+
+    def retry_failed(self, name=None):
+        query = "UPDATE jobs SET status = 'queued', attempts = 0, run_at = ? WHERE status = 'failed'"
+        params = [time.time()]
+        if name:
+            query += ' AND name = ?'
+            params.append(name)
+        count = self._connection().execute(query, params).rowcount
+        self._wake.set()
+        return count
+
+    def purge(self, older_than):
+        # Drop finished jobs older than `older_than` seconds
+        return self._connection().execute(
+            "DELETE FROM jobs WHERE status = 'done' AND finished_at < ?", (time.time() - older_than,)
+        ).rowcount
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'workers': self.workers,
+            'running': any(thread.is_alive() for thread in self._threads),
+            'processed': self.processed,
+            'failures': self.failures,
+            'jobs': self.counts(),
+        }
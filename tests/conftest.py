@@ -0,0 +1,41 @@
+import os
+import sys
+import warnings
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # app.py binds its engine at import, so point it at a scratch database first
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop('app', None)
+    import app as module
+    import idgen
+
+    module.app.config['TESTING'] = True
+    # The id generator outlives the app module; lease worker ids from this database
+    monkeypatch.setattr(idgen.complaint_ids, 'lease', idgen.WorkerLease())
+    with module.app.app_context():
+        module.db.create_all()
+    yield module.app
+    with module.app.app_context():
+        module.db.session.remove()
+        module.db.engine.dispose()
+    sys.modules.pop('app', None)
+
+
+@pytest.fixture
+def login(app):
+    def client_as(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        return client
+    return client_as
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+import stats
+from models import db, User, Complaint, Feedback
+
+DEPARTMENT = 'Ticket Booking'
+
+
+def seed(complaints):
+    admin = User(username='admin', password='x', role='Admin', department=DEPARTMENT)
+    employee = User(username='employee', password='x', role='Employee', department=DEPARTMENT)
+    passenger = User(username='passenger', password='x', role='User')
+    db.session.add_all([admin, employee, passenger])
+    db.session.flush()
+
+    now = datetime(2026, 10, 1, 12, 0)
+    for i in range(complaints):
+        created = now - timedelta(hours=i)
+        complaint = Complaint(
+            unique_id=f'C{i}', department=DEPARTMENT, date=created.date(), time=created.time(),
+            pnr_no=str(i), age=30, additional_info='late train', status='Completed', urgency=i % 7,
+            user_id=passenger.id, assigned_employee_id=employee.id
+        )
+        db.session.add(complaint)
+        db.session.flush()
+        for j in range(2):
+            feedback = Feedback(complaint.id, 'good service', ('Positive', 'Negative')[j], 4 + j % 2)
+            feedback.created_at = created
+            db.session.add(feedback)
+    db.session.commit()
+    stats.rebuild()
+    return admin.id
+
+
+def count_statements(app, client, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_admin_dashboard_query_count_does_not_grow_with_complaints(app, login):
+    with app.app_context():
+        admin_id = seed(3)
+    client = login(admin_id)
+    url = f'/admin_dashboard/{DEPARTMENT}'
+    client.get(url)  # warm-up: assignment index, first-request setup
+    few = count_statements(app, client, url)
+
+    with app.app_context():
+        passenger = User.query.filter_by(role='User').one()
+        employee = User.query.filter_by(role='Employee').one()
+        for i in range(3, 40):
+            complaint = Complaint(
+                unique_id=f'C{i}', department=DEPARTMENT, date=datetime(2026, 9, 1).date(),
+                time=datetime(2026, 9, 1).time(), pnr_no=str(i), age=30, status='Completed',
+                urgency=i % 7, user_id=passenger.id, assigned_employee_id=employee.id
+            )
+            db.session.add(complaint)
+            db.session.flush()
+            db.session.add(Feedback(complaint.id, 'bad', 'Negative', 1))
+        db.session.commit()
+        stats.rebuild()
+
+    many = count_statements(app, client, url)
+    assert many == few
+    # user, complaints page, feedback (selectin), summary, daily rows
+    assert few <= 6
+
+
+def test_solved_counts_are_shown(app, login):
+    import re
+    with app.app_context():
+        admin_id = seed(3)
+    client = login(admin_id)
+    dashboard = client.get(f'/admin_dashboard/{DEPARTMENT}').get_data(as_text=True)
+    assert re.search(r'Solved Complaints</h6>\s*<h3>3</h3>', dashboard)
+    employees = client.get('/admin/employees').get_data(as_text=True)
+    assert re.search(r'<td>employee</td>\s*<td>Employee</td>\s*<td>[^<]*</td>\s*<td>3</td>', employees)
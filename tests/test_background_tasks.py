@@ -0,0 +1,18 @@
+import time
+
+
+def test_first_request_starts_in_process_tasks(app):
+    import app as module
+    app.config['TESTING'] = False
+    try:
+        app.test_client().get('/login')
+        for task in module.in_process_tasks:
+            assert task.stats()['running']
+        deadline = time.monotonic() + 5
+        while module.assignment_reconciler.runs == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert module.assignment_reconciler.runs == 1
+        assert module.assignment_reconciler.failures == 0
+    finally:
+        for task in module.in_process_tasks:
+            task.stop()
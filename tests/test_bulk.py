@@ -0,0 +1,54 @@
+import io
+import json
+
+from ingest import parse_ndjson
+from models import db, User, Complaint
+
+ROW = json.dumps({'department': 'Ticket Booking', 'pnr_no': '123', 'age': 30}) + '\n'
+
+
+def passenger(app):
+    with app.app_context():
+        user = User(username='passenger', password='x', role='User')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def complaint_count(app):
+    with app.app_context():
+        return Complaint.query.count()
+
+
+def test_parse_ndjson_stops_past_limit():
+    lines = iter([ROW] * 10)
+    rows, errors = parse_ndjson(lines, limit=3)
+    assert len(rows) == 4 and not errors
+    assert len(list(lines)) == 6  # the rest was never read
+
+
+def test_bulk_rejects_too_many_rows(app, login):
+    import app as module
+    client = login(passenger(app))
+    body = ROW * (module.BULK_MAX_ROWS + 1)
+    response = client.post('/api/complaints/bulk', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 413
+    assert complaint_count(app) == 0
+
+
+def test_bulk_rejects_oversized_body(app, login):
+    client = login(passenger(app))
+    app.config['MAX_CONTENT_LENGTH'] = 1024
+    body = json.dumps([json.loads(ROW)] * 100)
+    response = client.post('/api/complaints/bulk', data=body, content_type='application/json')
+    assert response.status_code == 413
+    assert complaint_count(app) == 0
+
+
+def test_bulk_inserts_rows(app, login):
+    client = login(passenger(app))
+    response = client.post('/api/complaints/bulk', data=io.BytesIO((ROW * 3).encode()),
+                           content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.get_json()['inserted'] == 3
+    assert complaint_count(app) == 3
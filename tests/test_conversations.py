@@ -0,0 +1,17 @@
+from conversations import ConversationStore
+
+
+def test_purge_expired_drops_idle_sessions(monkeypatch):
+    import conversations
+    clock = [1000.0]
+    monkeypatch.setattr(conversations.time, 'monotonic', lambda: clock[0])
+    store = ConversationStore(ttl=60)
+    store.append('idle', 'user', 'hello')
+    clock[0] += 30
+    store.append('active', 'user', 'hello')
+    clock[0] += 45
+    assert store.purge_expired() == 1
+    assert store.stats()['sessions'] == 1
+    clock[0] += 60
+    assert store.purge_expired() == 1
+    assert store.stats() == {'sessions': 0, 'turns': 0, 'evicted': 0, 'expired': 2}
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from export import export_chunks
+from models import db, User, Complaint, ComplaintImage
+
+
+def test_complaint_export_lists_digests_in_upload_order(app):
+    with app.app_context():
+        passenger = User(username='passenger', password='x', role='User')
+        db.session.add(passenger)
+        db.session.flush()
+        created = datetime(2026, 10, 1, 12, 0)
+        complaint = Complaint(unique_id='C1', department='Ticket Booking', date=created.date(), time=created.time(),
+                              pnr_no='1', age=30, additional_info='', user_id=passenger.id)
+        db.session.add(complaint)
+        db.session.flush()
+        # Inserted out of order; position decides
+        for position, digest in [(2, 'c' * 64), (0, 'a' * 64), (1, 'b' * 64)]:
+            db.session.add(ComplaintImage(complaint_id=complaint.id, digest=digest, filename=f'{position}.jpg',
+                                          size=1, position=position))
+        db.session.commit()
+
+        lines = ''.join(export_chunks('complaints', 'csv')).splitlines()
+    header, row = lines[0].split(','), lines[1].split(',')
+    assert header[8] == 'image_digests'
+    assert row[8] == ' '.join(['a' * 64, 'b' * 64, 'c' * 64])
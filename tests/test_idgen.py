@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+import idgen
+from idgen import IdGenerator, WorkerLease
+from models import db, IdWorkerLease
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def lease_row(worker):
+    return db.session.get(IdWorkerLease, worker, populate_existing=True)
+
+
+def test_processes_lease_distinct_workers(app):
+    with app.app_context():
+        workers = [WorkerLease().worker_id() for _ in range(3)]
+        assert workers == [0, 1, 2]
+
+
+def test_lapsed_lease_is_taken_over(app):
+    clock = Clock()
+    with app.app_context():
+        first = WorkerLease(ttl=60, clock=clock)
+        assert first.worker_id() == 0
+        clock.now += 61
+        second = WorkerLease(ttl=60, clock=clock)
+        assert second.worker_id() == 0
+        # The first holder notices on renewal and claims another id
+        assert first.worker_id() == 1
+        assert lease_row(0).owner != lease_row(1).owner
+
+
+def test_lease_renews_after_half_its_ttl(app):
+    clock = Clock()
+    with app.app_context():
+        lease = WorkerLease(ttl=60, clock=clock)
+        lease.worker_id()
+        expires = lease_row(0).expires_at
+        clock.now += 31
+        assert lease.worker_id() == 0
+        assert lease_row(0).expires_at > expires
+        assert WorkerLease(ttl=60, clock=clock).worker_id() == 1
+
+
+def test_forked_child_claims_its_own_worker(app, monkeypatch):
+    with app.app_context():
+        lease = WorkerLease()
+        assert lease.worker_id() == 0
+        monkeypatch.setattr(os, 'getpid', lambda: -1)
+        assert lease.worker_id() == 1
+
+
+def test_release_frees_the_worker(app):
+    with app.app_context():
+        lease = WorkerLease()
+        lease.worker_id()
+        lease.release()
+        assert WorkerLease().worker_id() == 0
+
+
+def test_generator_needs_a_worker(monkeypatch):
+    monkeypatch.delenv('COMPLAINT_ID_WORKER', raising=False)
+    with pytest.raises(RuntimeError):
+        IdGenerator().next_id()
+    generated = IdGenerator(worker_id=5).next_id()
+    assert idgen.decode(generated) >> idgen.SEQUENCE_BITS & idgen.MAX_WORKER == 5
+
+
+def test_chatbot_ignores_words_that_only_look_like_ids():
+    from chatbot_engine import SmartChatbot
+    chatbot = SmartChatbot()
+    issued = IdGenerator(worker_id=1).next_id()
+    assert chatbot.detect_complaint_id('the 3rdclasscoach was dirty, see #12') == '12'
+    assert chatbot.detect_complaint_id(f'3rdclasscoach, status of {issued.lower()}?') == issued
+    future = idgen.encode(1_950_000_000_000 << (idgen.WORKER_BITS + idgen.SEQUENCE_BITS))
+    assert not idgen.is_plausible(future)
+    assert chatbot.detect_complaint_id(f'complaint {future}') is None
@@ -0,0 +1,60 @@
+import pytest
+
+from models import Complaint
+from pagination import decode_cursor, encode_cursor
+
+BY_URGENCY = (Complaint.urgency, Complaint.id)
+BY_RECENT = (Complaint.date, Complaint.time, Complaint.id)
+
+
+def test_round_trip():
+    from datetime import date, time
+    values = [date(2026, 2, 10), time(16, 13, 51, 795481), 2]
+    assert decode_cursor(encode_cursor(values), BY_RECENT) == values
+
+
+@pytest.mark.parametrize('values, columns', [
+    ([1, 2, 3], BY_RECENT),           # ints where dates are expected
+    ([None, None, None], BY_RECENT),
+    ([[], {}, 1], BY_RECENT),
+    (['x', 1], BY_URGENCY),
+    ([1e999, 1], BY_URGENCY),
+    ([2 ** 64, 1], BY_URGENCY),      # does not fit an SQLite integer
+    ([1], BY_URGENCY),
+])
+def test_forged_cursor_is_a_value_error(values, columns):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(values), columns)
+
+
+@pytest.mark.parametrize('cursor', ['!!!', 'bm90IGpzb24', 'eyJhIjoxfQ'])
+def test_garbage_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, BY_URGENCY)
+
+
+def test_track_complaints_links_pages(app, login):
+    import re
+    from datetime import datetime, timedelta
+    from models import db, User
+
+    with app.app_context():
+        passenger = User(username='passenger', password='x', role='User')
+        db.session.add(passenger)
+        db.session.flush()
+        now = datetime(2026, 10, 1, 12, 0)
+        for i in range(3):
+            created = now - timedelta(hours=i)
+            db.session.add(Complaint(
+                unique_id=f'C{i}', department='Ticket Booking', date=created.date(), time=created.time(),
+                pnr_no=str(i), age=30, additional_info='', user_id=passenger.id
+            ))
+        db.session.commit()
+        client = login(passenger.id)
+
+    first = client.get('/track_complaints?per_page=2').get_data(as_text=True)
+    assert 'Next page' in first and 'First page' not in first
+    next_url = re.search(r'href="([^"]*cursor=[^"]*)"', first).group(1).replace('&amp;', '&')
+    second = client.get(next_url + '&per_page=2').get_data(as_text=True)
+    assert 'First page' in second and 'Next page' not in second
+    assert 'C2' in second and 'C0' not in second
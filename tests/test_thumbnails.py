@@ -0,0 +1,40 @@
+import io
+import os
+import signal
+import time
+
+from PIL import Image
+
+from thumbnails import ThumbnailPipeline, render_variants
+from uploads import UploadStore
+
+
+def jpeg(color, size=(800, 600)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+def test_truncated_image_is_not_renderable(tmp_path):
+    source = tmp_path / 'truncated.jpg'
+    source.write_bytes(jpeg((200, 30, 30))[:400])
+    assert render_variants(str(source), {'thumb': str(tmp_path / 'thumb.jpg')}) is None
+    assert not (tmp_path / 'thumb.jpg').exists()
+
+
+def test_pool_is_rebuilt_after_a_worker_dies(tmp_path):
+    store = UploadStore(str(tmp_path))
+    pipeline = ThumbnailPipeline(store, str(tmp_path / 'derived'), workers=1)
+    try:
+        first, _, _ = store.save(io.BytesIO(jpeg((20, 90, 200))))
+        assert sorted(pipeline.generate(first)) == ['preview', 'thumb']
+
+        for process in list(pipeline._executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        time.sleep(0.2)
+
+        second, _, _ = store.save(io.BytesIO(jpeg((20, 200, 90))))
+        assert sorted(pipeline.generate(second)) == ['preview', 'thumb']
+        assert not pipeline.missing(second)
+    finally:
+        pipeline.shutdown()
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# name -> (longest side in px, JPEG quality)
+VARIANTS = {
+    'thumb': (160, 70),
+    'preview': (1024, 80),
+}
+
+
+def render_variants(source, targets):
+    """Write each missing variant of `source`. Runs in a worker process.
+
+    `targets` maps variant name -> output path. Returns the names written, or
+    None if the file is not an image Pillow can read, or is truncated.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    written = []
+    try:
+        original = Image.open(source)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None
+    with original:
+        largest = max(VARIANTS[name][0] for name in targets)
+        # JPEGs decode at 1/2, 1/4 or 1/8 scale, much cheaper than a full decode
+        original.draft('RGB', (largest, largest))
+        for name, path in targets.items():
+            if os.path.exists(path):
+                continue
+            side, quality = VARIANTS[name]
+            try:
+                image = ImageOps.exif_transpose(original)  # a rotated copy
+                image.thumbnail((side, side))
+                if image.mode != 'RGB':
+                    image = image.convert('RGB')
+            except (Image.DecompressionBombError, OSError):
+                # Corrupt or truncated pixel data; retrying will not help
+                return None
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as tmp:
+                image.save(tmp, 'JPEG', quality=quality, optimize=True, progressive=True)
+            os.replace(tmp_path, path)
+            written.append(name)
+    return written
+
+
+class ThumbnailPipeline:
+    """Resized JPEG variants of stored uploads, cached on disk next to them.
+
+    Variants live in `<root>/<variant>/ab/cd/<digest>.jpg` and are rendered
+    by a small process pool (created on first use), so resizing never runs
+    on a request thread or holds the GIL of the web process.
+    """
+
+    def __init__(self, store, root, workers=2):
+        self.store = store
+        self.root = root
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def path_for(self, digest, variant):
+        if variant not in VARIANTS:
+            raise ValueError(f'unknown variant: {variant!r}')
+        self.store.path_for(digest)  # validates the digest
+        return os.path.join(self.root, variant, digest[:2], digest[2:4], digest + '.jpg')
+
+    def missing(self, digest):
+        return {
+            name: self.path_for(digest, name)
+            for name in VARIANTS
+            if not os.path.exists(self.path_for(digest, name))
+        }
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Not fork: this runs on a task-queue thread of a multi-threaded
+                # web process, and a forked child can inherit a lock held mid-way
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _discard(self, executor):
+        # A worker died (OOM, a crash in a decoder) and the pool is unusable;
+        # the next _pool() call starts a fresh one
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, digest, targets):
+        executor = self._pool()
+        try:
+            return executor, executor.submit(render_variants, self.store.path_for(digest), targets)
+        except BrokenProcessPool:
+            self._discard(executor)
+            executor = self._pool()
+            return executor, executor.submit(render_variants, self.store.path_for(digest), targets)
+
+    def submit(self, digest):
+        targets = self.missing(digest)
+        if not targets:
+            return None
+        return self._submit(digest, targets)[1]
+
+    def generate(self, digest):
+        targets = self.missing(digest)
+        if not targets:
+            return []
+        for attempt in range(2):
+            executor, future = self._submit(digest, targets)
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                self._discard(executor)
+                # Once more on a fresh pool; a file that kills it again is
+                # left to the task queue to record as failed
+                if attempt:
+                    raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
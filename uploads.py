@@ -0,0 +1,70 @@
+import hashlib
+import os
+import re
+import tempfile
+
+DIGEST_RE = re.compile(r'[0-9a-f]{64}')
+
+
+class UploadStore:
+    """Content-addressed blob store for uploaded files.
+
+    Uploads are streamed to a temporary file in `chunk_size` pieces while
+    being hashed, then moved to `<root>/sha256/<ab>/<cd>/<digest>`. A blob
+    that is already stored is not written twice, so identical photos share
+    one file and different photos with the same name never collide.
+    """
+
+    def __init__(self, root, chunk_size=64 * 1024):
+        self.root = os.path.join(root, 'sha256')
+        self.chunk_size = chunk_size
+        self._tmp = os.path.join(self.root, 'tmp')
+        os.makedirs(self._tmp, exist_ok=True)
+        self._shards = set()
+
+    def path_for(self, digest):
+        if not DIGEST_RE.fullmatch(digest):
+            raise ValueError(f'not a sha256 digest: {digest!r}')
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest):
+        return os.path.exists(self.path_for(digest))
+
+    def save(self, stream):
+        """Store a readable binary stream. Returns (digest, size, created)."""
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    sha.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            digest = sha.hexdigest()
+            path = self.path_for(digest)
+            if os.path.exists(path):
+                os.unlink(tmp_path)
+                return digest, size, False
+
+            shard = os.path.dirname(path)
+            if shard not in self._shards:
+                os.makedirs(shard, exist_ok=True)
+                self._shards.add(shard)
+            # Atomic; a concurrent upload of the same bytes just replaces it with identical content
+            os.replace(tmp_path, path)
+            return digest, size, True
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def save_file(self, path):
+        with open(path, 'rb') as file:
+            return self.save(file)
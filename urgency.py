@@ -0,0 +1,167 @@
+import json
+import os
+import re
+import string
+import threading
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KEYWORDS_PATH = os.environ.get('URGENCY_KEYWORDS_PATH', os.path.join(BASE_DIR, 'urgency_keywords.json'))
+
+# Punctuation separates words the same way whitespace does
+_SEPARATORS = str.maketrans({ch: ' ' for ch in string.punctuation})
+
+
+class KeywordScorer:
+    """Scores complaint text against the urgency keyword table.
+
+    The text is lowercased and tokenized once; single-word keywords are then
+    resolved with one set intersection and multi-word keywords are only
+    confirmed with their precompiled phrase pattern when all of their words
+    occur in the text. Matching is on whole words, so "ill" no longer fires on
+    "will". The table is read from a JSON file and recompiled whenever the
+    file's mtime changes, so edits to the config are picked up without a
+    restart.
+    """
+
+    def __init__(self, path=KEYWORDS_PATH, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._last_check = 0.0
+        self._load()
+
+    def _load(self):
+        with open(self.path) as f:
+            config = json.load(f)
+        mtime = os.stat(self.path).st_mtime
+
+        words = {}
+        phrases = []
+        for keyword, score in config['keywords'].items():
+            parts = keyword.lower().translate(_SEPARATORS).split()
+            if len(parts) == 1:
+                words[parts[0]] = max(score, words.get(parts[0], score))
+            elif parts:
+                pattern = re.compile(r'(?<!\S)' + r'\s+'.join(map(re.escape, parts)) + r'(?!\S)')
+                phrases.append((score, ' '.join(parts), frozenset(parts), pattern))
+        # Highest score first so phrase checks can stop at the first hit
+        phrases.sort(key=lambda phrase: -phrase[0])
+
+        # Swap everything in at once; readers never see a half-built table.
+        self._state = (
+            words,
+            phrases,
+            config.get('department_weights', {}),
+            config.get('default_department_weight', 3),
+            config.get('default_impact_score', 1),
+        )
+        self._mtime = mtime
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                return False
+            if mtime == self._mtime:
+                return False
+            try:
+                self._load()
+            except (OSError, ValueError, KeyError):
+                # Keep serving the last good table if the edit is broken
+                return False
+            return True
+
+    def impact_score(self, text):
+        self.maybe_reload()
+        words, phrases, _, _, best = self._state
+        text = (text or '').lower().translate(_SEPARATORS)
+        tokens = set(text.split())
+
+        for word in tokens & words.keys():
+            if words[word] > best:
+                best = words[word]
+        for score, _, parts, pattern in phrases:
+            if score <= best:
+                break
+            if parts <= tokens and pattern.search(text):
+                best = score
+                break
+        return best
+
+    def department_weight(self, department):
+        self.maybe_reload()
+        weights, default = self._state[2], self._state[3]
+        return weights.get(department, default)
+
+
+scorer = KeywordScorer()
+
+
+# Ages at which time sensitivity steps down from 3 to 2 and from 2 to 1
+SENSITIVITY_STEPS = (timedelta(hours=1), timedelta(hours=6))
+
+
+def time_sensitivity(created_at, now=None):
+    hours_elapsed = ((now or datetime.now()) - created_at).total_seconds() / 3600
+    if hours_elapsed <= 1:
+        return 3
+    elif hours_elapsed <= 6:
+        return 2
+    return 1
+
+
+def crossed_sensitivity_step(created_at, since, now):
+    # True if the complaint's age went past a step between the two runs
+    return any(since <= created_at + step < now for step in SENSITIVITY_STEPS)
+
+
+def age_factor(age):
+    return 2 if age > 65 else (1 if age < 18 else 0)
+
+
+def calculate_urgency(complaint, now=None):
+    impact_score = scorer.impact_score(complaint.additional_info)
+    created_at = datetime.combine(complaint.date, complaint.time)
+    department_weight = scorer.department_weight(complaint.department)
+
+    return (impact_score * time_sensitivity(created_at, now)) + age_factor(complaint.age) + department_weight
+
+
+def score_batch(departments, created_at, ages, texts, now=None):
+    import numpy as np
+
+    now = np.datetime64(now or datetime.now(), 'us')
+
+    # Keyword matching is per text; everything else is array arithmetic
+    impact = np.fromiter((scorer.impact_score(text) for text in texts), dtype=np.int64, count=len(texts))
+
+    hours_elapsed = (now - np.asarray(created_at, dtype='datetime64[us]')) / np.timedelta64(1, 'h')
+    sensitivity = np.select([hours_elapsed <= 1, hours_elapsed <= 6], [3, 2], default=1)
+
+    ages = np.asarray(ages, dtype=np.int64)
+    age = np.where(ages > 65, 2, np.where(ages < 18, 1, 0))
+
+    # Look each distinct department up once and scatter the weights back
+    names, inverse = np.unique(np.asarray(departments, dtype=object).astype(str), return_inverse=True)
+    weights = np.array([scorer.department_weight(name) for name in names], dtype=np.int64)[inverse]
+
+    return impact * sensitivity + age + weights
+
+
+def score_rows(rows, now=None):
+    # rows: (id, department, date, time, age, additional_info) tuples
+    if not rows:
+        return [], []
+    ids, departments, dates, times, ages, texts = zip(*rows)
+    created_at = [datetime.combine(d, t) for d, t in zip(dates, times)]
+    return ids, score_batch(departments, created_at, ages, texts, now=now)